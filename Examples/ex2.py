@@ -6,6 +6,7 @@ from iminuit.cost import ExtendedBinnedNLL
 from math import floor, ceil
 from IPython.display import display
 from scipy.stats import chi2
+from spl.stat import Histogram
 
 
 def cdf(bin_edges, N_signal, mu, sigma, N_background, tau):
@@ -15,8 +16,8 @@ def cdf(bin_edges, N_signal, mu, sigma, N_background, tau):
 def main():
     data = np.loadtxt("data/dati.txt")
 
-    bin_content, bin_edges = np.histogram(data, bins=(floor(len(data) / 100)),
-                                          range=(floor(min(data)), ceil(max(data))))
+    histogram = Histogram(bins=(floor(len(data) / 100)), range=(floor(min(data)), ceil(max(data)))).fill(data)
+    bin_content, bin_edges = histogram
 
     sample_mean = np.mean(data)
     sample_sigma = np.std(data)
@@ -28,7 +29,7 @@ def main():
     ax.hist(data, bins=bin_edges, color="orange")
     plt.show()
 
-    my_cost_func = ExtendedBinnedNLL(bin_content, bin_edges, cdf)
+    my_cost_func = ExtendedBinnedNLL(*histogram, cdf)
 
     N_events = sum(bin_content)
 
@@ -0,0 +1,72 @@
+"""
+Import-time benchmark of spl: every module is imported in a fresh interpreter, the best time of some repetitions
+is compared with a budget, and the heavy dependencies which must be loaded only on first use (matplotlib, scipy,
+iminuit, IPython, the process pool) are checked to be absent after the import. The exit status is 1 if a check
+fails. Run it with spl importable, e.g. from the directory which contains the package:
+
+    python spl/benchmarks/import_time.py
+"""
+
+import argparse
+import subprocess
+import sys
+
+# modules which are measured, with their budget in seconds
+MODULES = {'spl.stat': 0.5, 'spl.minimize': 0.5, 'spl.generate': 0.5, 'spl.integral': 0.5, 'spl.plot': 0.5}
+
+# dependencies which must not be loaded by the import of any module
+LAZY = ('matplotlib', 'scipy', 'iminuit', 'IPython', 'concurrent.futures.process', 'spl.Examples')
+
+_PROBE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(' '.join(name for name in {lazy!r} if name in sys.modules))
+'''
+
+
+def measure(module: str,
+            repeat: int) -> tuple[float, list[str]]:
+    """
+    Measure of the import time of a module in fresh interpreters
+
+    Args:
+        module: name of the module
+        repeat: number of interpreters
+
+    Returns:
+        The best import time in seconds and the list of the heavy dependencies loaded by the import
+    """
+
+    best, loaded = float('inf'), []
+    for repetition in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, lazy=LAZY)],
+                                capture_output=True, text=True, check=True).stdout.split('\n')
+        best = min(best, float(output[0]))
+        loaded = output[1].split()
+    return best, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Import-time benchmark of spl')
+    parser.add_argument('--repeat', type=int, default=5, help='number of fresh interpreters for each module')
+    parser.add_argument('--scale', type=float, default=1., help='factor applied to the budgets of the modules')
+    arguments = parser.parse_args()
+
+    failed = False
+    for module, budget in MODULES.items():
+        elapsed, loaded = measure(module, arguments.repeat)
+        problems = []
+        if elapsed > budget * arguments.scale:
+            problems.append(f'SLOW (budget {budget * arguments.scale:.3f} s)')
+        if loaded:
+            problems.append('LOADS ' + ', '.join(loaded))
+        failed |= bool(problems)
+        print(f'{module:<14} {1000. * elapsed:8.1f} ms  {"; ".join(problems) or "ok"}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
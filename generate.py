@@ -1,10 +1,146 @@
 import numpy as np
 import math
 import random
+import os
+import hashlib
+from collections.abc import Iterator
+from functools import lru_cache
+from itertools import repeat
+
+
+# generator shared by the array engine, re-seeded when a seed different from 0. is passed
+_default_generator = np.random.default_rng()
+
+# number of rows generated at once by the central limit theorem engines and
+# number of pseudo-casual numbers generated by each chunk of the parallel driver
+_CHUNK_SIZE = 1 << 20
+
+
+# first element of the spawn keys of the substreams, far above the child counters used by SeedSequence.spawn
+_SUBSTREAM_TAG = 0x73756273
+# spawn key element of the seed of the Halton scrambling of a stream, distinct from the substream tag
+_HALTON_TAG = 0x68616c74
+
+
+class Stream:
+    """
+    Independent stream of pseudo-casual numbers, built on a numpy SeedSequence. Streams do not share
+    any state with the global random modules, so that threads or processes generating at the same time
+    obtain reproducible results. Independent child streams are obtained with spawn or substream
+
+    Args:
+        seed: non-negative integer seed or SeedSequence of the stream
+            (optional, default: None, fresh entropy from the operating system)
+    """
+
+    __slots__ = ('seed_sequence', 'generator')
+
+    def __init__(self,
+                 seed: int | np.random.SeedSequence = None):
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+
+    def spawn(self,
+              n: int) -> list['Stream']:
+        """
+        Generation of n new independent child streams, different at every call
+
+        Args:
+            n: number of child streams
+
+        Returns:
+            A list of n independent streams
+        """
+
+        return [Stream(child) for child in self.seed_sequence.spawn(n)]
+
+    def substream(self,
+                  index: int) -> 'Stream':
+        """
+        Generation of the child stream with a given index. The same index gives always the same
+        stream, so that the work can be split into numbered chunks in a reproducible way. The substreams
+        live in their own key space, under a tag which spawn never produces, so they are independent of
+        the streams returned by spawn and of all their descendants
+
+        Args:
+            index: index of the child stream
+
+        Returns:
+            The independent child stream identified by index
+        """
+
+        parent = self.seed_sequence
+        return Stream(np.random.SeedSequence(parent.entropy,
+                                             spawn_key=parent.spawn_key + (_SUBSTREAM_TAG, index),
+                                             pool_size=parent.pool_size))
+
+    def random(self) -> float:
+        """
+        Generation of a pseudo-casual number distributed accordingly to uniform distribution between [0, 1)
+
+        Returns:
+            A pseudo-casual number generated according to uniform distribution between [0, 1)
+        """
+
+        return float(self.generator.random())
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _generator(seed: float = 0.,
+               stream: Stream = None) -> np.random.Generator:
+    """
+    Returns the numpy generator used by the array engine: the generator of the stream if it is passed,
+    otherwise the shared generator, re-seeded if the seed is different from 0.
+
+    Args:
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The numpy random generator
+    """
+
+    global _default_generator
+    if stream is not None:
+        return stream.generator
+    if seed != 0.:
+        _default_generator = np.random.default_rng(hash(seed) & 0xFFFFFFFFFFFFFFFF)
+    return _default_generator
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_uniform(n: int,
+                  seed: float = 0.,
+                  stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual number distributed accordingly
+    to uniform distribution between [0, 1) starting from an optional seed
+    different from 0.
+
+    Args:
+        n: number of pseudo-casual numbers to generate
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of n pseudo-casual numbers generated according to uniform distribution between [0, 1)
+    """
+
+    return _generator(seed, stream).random(n)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
 def list_uniform(n: int,
-                 seed: float = 0.) -> list[float]:
+                 seed: float = 0.,
+                 stream: Stream = None) -> list[float]:
     """
     Generation of a list of n pseudo-casual number distributed accordingly
     to uniform distribution between [0, 1) starting from an optional seed
@@ -13,24 +149,21 @@ def list_uniform(n: int,
     Args:
         n: number of pseudo-casual numbers to generate
         seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
 
     Returns:
         A list of n pseudo-casual numbers generated according to uniform distribution between [0, 1)
     """
 
-    if seed != 0.:
-        random.seed(seed)
-    random_list = []
-    for i in range(n):
-        random_list.append(random.random())
-    return random_list
+    return array_uniform(n, seed, stream).tolist()
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
 def uniform_range(minimum: float,
-                  maximum: float) -> float:
+                  maximum: float,
+                  stream: Stream = None) -> float:
     """
     Generation of a pseudo-casual number distributed accordingly to uniform distribution between
     [minimum, maximum)
@@ -38,21 +171,52 @@ def uniform_range(minimum: float,
     Args:
         minimum: lower limit of the range (included)
         maximum: upper limit of the range (excluded)
+        stream: independent stream of pseudo-casual numbers (optional, default: None, global random module)
 
     Returns:
         A pseudo-casual numbers generated according to uniform distribution between [minimum, maximum)
     """
 
+    if stream is not None:
+        return minimum + (stream.random() * (maximum - minimum))
     return minimum + (random.random() * (maximum - minimum))
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
+def array_uniform_range(minimum: float,
+                        maximum: float,
+                        n: int,
+                        seed: float = 0.,
+                        stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual number distributed accordingly
+    to uniform distribution between [minimum, maximum) starting from an optional seed
+    different from 0.
+
+    Args:
+        minimum: lower limit of the range (included)
+        maximum: upper limit of the range (excluded)
+        n: number of pseudo-casual numbers to generate
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of n pseudo-casual numbers generated according to uniform distribution between [minimum, maximum)
+    """
+
+    return minimum + _generator(seed, stream).random(n) * (maximum - minimum)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
 def list_uniform_range(minimum: float,
                        maximum: float,
                        n: int,
-                       seed: float = 0.) -> list[float]:
+                       seed: float = 0.,
+                       stream: Stream = None) -> list[float]:
     """
         Generation of a list of n pseudo-casual number distributed accordingly
         to uniform distribution between [minimum, maximum) starting from an optional seed
@@ -63,18 +227,13 @@ def list_uniform_range(minimum: float,
             maximum: upper limit of the range (excluded)
             n: number of pseudo-casual numbers to generate
             seed: starting seed for the random generation (optional)
+            stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
 
         Returns:
             A list of n pseudo-casual numbers generated according to uniform distribution between [minimum, maximum)
         """
 
-    if seed != 0.:
-        random.seed(seed)
-    random_list = []
-    for i in range(n):
-        # Return the next random floating point number in the range 0.0 <= X < 1.0
-        random_list.append(uniform_range(minimum, maximum))
-    return random_list
+    return array_uniform_range(minimum, maximum, n, seed, stream).tolist()
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
@@ -82,15 +241,18 @@ def list_uniform_range(minimum: float,
 
 def clt_ms(mean: float,
            sigma: float,
-           n_sum: int = 10) -> float:
+           n_sum: int = 10,
+           stream: Stream = None) -> float:
     """
     Generation of a pseudo-casual number distributed accordingly to the gaussian distribution
-    with the central limit theorem algorithm between known mean value and standard deviation
+    with the central limit theorem algorithm between known mean value and standard deviation.
+    The tails are cut at mean +- sqrt(3 * n_sum) * sigma: use gauss_ms for an exact gaussian distribution
 
     Args:
         mean: mean value
         sigma: standard deviation
         n_sum: number of repetitions used in the algorithm (optional, default: 10)
+        stream: independent stream of pseudo-casual numbers (optional, default: None, global random module)
 
     Returns:
         A pseudo-casual numbers generated according to gaussian distribution specified
@@ -102,7 +264,7 @@ def clt_ms(mean: float,
     minimum = mean - delta
     maximum = mean + delta
     for i in range(n_sum):
-        y += uniform_range(minimum, maximum)
+        y += uniform_range(minimum, maximum, stream)
     y /= n_sum
     return y
 
@@ -110,11 +272,42 @@ def clt_ms(mean: float,
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
+def array_clt_ms(mean: float,
+                 sigma: float,
+                 n: int,
+                 n_sum: int = 10,
+                 seed: float = 0.,
+                 stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual numbers distributed accordingly to the gaussian distribution
+    with the central limit theorem algorithm known mean value and standard deviation starting from an optional seed
+    different from 0.
+
+    Args:
+        mean: mean value
+        sigma: standard deviation
+        n: length of the array
+        n_sum: number of repetitions used in the algorithm (optional, default: 10)
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of pseudo-casual numbers generated according to gaussian distribution specified
+    """
+
+    delta = math.sqrt(3 * n_sum) * sigma
+    return array_clt_minmax(mean - delta, mean + delta, n, n_sum, seed, stream)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
 def list_clt_ms(mean: float,
                 sigma: float,
                 n: int,
                 n_sum: int = 10,
-                seed: float = 0.) -> list[float]:
+                seed: float = 0.,
+                stream: Stream = None) -> list[float]:
     """
     Generation of a list of n pseudo-casual numbers distributed accordingly to the gaussian distribution
     with the central limit theorem algorithm known mean value and standard deviation starting from an optional seed
@@ -126,18 +319,95 @@ def list_clt_ms(mean: float,
         n: length of the list
         n_sum: number of repetitions used in the algorithm (optional, default: 10)
         seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
 
     Returns:
         A list of pseudo-casual numbers generated according to gaussian distribution specified
 
     """
 
-    if seed != 0.:
-        random.seed(seed)
-    random_list = []
-    for i in range(n):
-        random_list.append(clt_ms(mean, sigma, n_sum))
-    return random_list
+    return array_clt_ms(mean, sigma, n, n_sum, seed, stream).tolist()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def gauss_ms(mean: float,
+             sigma: float,
+             stream: Stream = None) -> float:
+    """
+    Generation of a pseudo-casual number distributed accordingly to the gaussian distribution
+    with the polar method of Marsaglia, which uses on average 2.55 uniform numbers and has exact tails
+
+    Args:
+        mean: mean value
+        sigma: standard deviation
+        stream: independent stream of pseudo-casual numbers (optional, default: None, global random module)
+
+    Returns:
+        A pseudo-casual numbers generated according to gaussian distribution specified
+    """
+
+    s = 0.
+    u = 0.
+    while s == 0. or s >= 1.:
+        u = uniform_range(-1., 1., stream)
+        v = uniform_range(-1., 1., stream)
+        s = u * u + v * v
+    return mean + sigma * u * math.sqrt(-2. * math.log(s) / s)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_gauss_ms(mean: float,
+                   sigma: float,
+                   n: int,
+                   seed: float = 0.,
+                   stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual numbers distributed accordingly to the gaussian distribution
+    with known mean value and standard deviation, with the ziggurat method of numpy which uses about one
+    random number for each gaussian number and has exact tails
+
+    Args:
+        mean: mean value
+        sigma: standard deviation
+        n: length of the array
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of pseudo-casual numbers generated according to gaussian distribution specified
+    """
+
+    return _generator(seed, stream).normal(mean, sigma, n)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def list_gauss_ms(mean: float,
+                  sigma: float,
+                  n: int,
+                  seed: float = 0.,
+                  stream: Stream = None) -> list[float]:
+    """
+    Generation of a list of n pseudo-casual numbers distributed accordingly to the gaussian distribution
+    with known mean value and standard deviation, with exact tails
+
+    Args:
+        mean: mean value
+        sigma: standard deviation
+        n: length of the list
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        A list of pseudo-casual numbers generated according to gaussian distribution specified
+    """
+
+    return array_gauss_ms(mean, sigma, n, seed, stream).tolist()
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
@@ -145,7 +415,8 @@ def list_clt_ms(mean: float,
 
 def clt_minmax(minimum: float,
                maximum: float,
-               n_sum: int = 10) -> float:
+               n_sum: int = 10,
+               stream: Stream = None) -> float:
     """
     Generation of a pseudo-casual number with the central limit theorem algorithm
     between [minimum, maximum)
@@ -154,6 +425,7 @@ def clt_minmax(minimum: float,
         minimum: lower limit of the range (included)
         maximum: upper limit of the range (excluded)
         n_sum: number of repetitions used in the algorithm (optional, default: 10)
+        stream: independent stream of pseudo-casual numbers (optional, default: None, global random module)
 
     Returns:
         A pseudo-casual numbers generated with the central limit theorem algorithm
@@ -162,7 +434,7 @@ def clt_minmax(minimum: float,
 
     y = 0.
     for i in range(n_sum):
-        y += uniform_range(minimum, maximum)
+        y += uniform_range(minimum, maximum, stream)
     y /= n_sum
     return y
 
@@ -170,11 +442,48 @@ def clt_minmax(minimum: float,
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
+def array_clt_minmax(minimum: float,
+                     maximum: float,
+                     n: int,
+                     n_sum: int = 10,
+                     seed: float = 0.,
+                     stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual numbers distributed between [minimum, maximum)
+    with the central limit theorem algorithm starting from an optional seed
+    different from 0. The uniform numbers are generated as a matrix of n_sum columns,
+    averaged by rows in blocks to keep the memory bounded
+
+    Args:
+        minimum: lower limit of the range (included)
+        maximum: upper limit of the range (excluded)
+        n: length of the array
+        n_sum: number of repetitions used in the algorithm (optional, default: 10)
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of pseudo-casual numbers generated with the central limit theorem algorithm
+    """
+
+    generator = _generator(seed, stream)
+    random_array = np.empty(n)
+    for start in range(0, n, _CHUNK_SIZE):
+        stop = min(start + _CHUNK_SIZE, n)
+        matrix = generator.random((stop - start, n_sum))
+        random_array[start:stop] = matrix.mean(axis=1)
+    return minimum + random_array * (maximum - minimum)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
 def list_clt_minmax(minimum: float,
                     maximum: float,
                     n: int,
                     n_sum: int = 10,
-                    seed: float = 0.) -> list[float]:
+                    seed: float = 0.,
+                    stream: Stream = None) -> list[float]:
     """
     Generation of a list of n pseudo-casual numbers distributed between [minimum, maximum)
     with the central limit theorem algorithm starting from an optional seed
@@ -186,25 +495,48 @@ def list_clt_minmax(minimum: float,
         n: length of the list
         n_sum: number of repetitions used in the algorithm (optional, default: 10)
         seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
 
     Returns:
         A list of pseudo-casual numbers generated according to gaussian distribution specified
 
     """
 
-    if seed != 0.:
-        random.seed(seed)
-    random_list = []
-    for i in range(n):
-        random_list.append(clt_minmax(minimum, maximum, n_sum))
-    return random_list
+    return array_clt_minmax(minimum, maximum, n, n_sum, seed, stream).tolist()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_ifm_exponential(t_0: float,
+                          n: int,
+                          seed: float = 0.,
+                          stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual numbers distributed accordingly
+    to an exponential distribution with a characteristic time t_0 with the inverse function method
+
+    Args:
+        t_0: characteristic time of the exponential distribution
+        n: length of the array
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of pseudo-casual numbers generated according to an exponential distribution
+        with a characteristic time t_0
+    """
+
+    return -np.log1p(-_generator(seed, stream).random(n)) * t_0
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
 def list_ifm_exponential(t_0: float,
-                         n: int) -> list[float]:
+                         n: int,
+                         seed: float = 0.,
+                         stream: Stream = None) -> list[float]:
     """
     Generation of a list of n pseudo-casual numbers distributed accordingly
     to an exponential distribution with a characteristic time t_0 with the inverse function method
@@ -212,23 +544,59 @@ def list_ifm_exponential(t_0: float,
     Args:
         t_0: characteristic time of the exponential distribution
         n: length of the list
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
 
     Returns:
         A list of pseudo-casual numbers generated according to an exponential distribution
         with a characteristic time t_0
     """
 
-    random_list = []
-    for i in range(n):
-        random_list.append(-((np.log(1-random.random()))*t_0))
-    return random_list
+    return array_ifm_exponential(t_0, n, seed, stream).tolist()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_ifm_poisson(lambda_value: float,
+                      n: int,
+                      seed: float = 0.,
+                      stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual numbers distributed accordingly
+    to a poissonian distribution with an expected value lambda_value with the inverse function method
+    combined with a monte-carlo/toy experiments technique. At each step one exponential number is
+    generated at once for all the toy experiments which are still running
+
+    Args:
+        lambda_value: expected value of the poissonian distribution
+        n: length of the array
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of pseudo-casual numbers generated according to a poissonian distribution with
+        an expected value lambda_value
+    """
+
+    generator = _generator(seed, stream)
+    counts = np.zeros(n, dtype=np.int64)
+    delta = np.zeros(n)
+    running = np.arange(n)
+    while running.size > 0:
+        delta[running] -= np.log1p(-generator.random(running.size))
+        running = running[delta[running] <= lambda_value]
+        counts[running] += 1
+    return counts
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
 def list_ifm_poisson(lambda_value: float,
-                     n: int) -> list[float]:
+                     n: int,
+                     seed: float = 0.,
+                     stream: Stream = None) -> list[float]:
     """
     Generation of a list of n pseudo-casual numbers distributed accordingly
     to a poissonian distribution with an expected value lambda_value with the inverse function method
@@ -237,60 +605,1187 @@ def list_ifm_poisson(lambda_value: float,
     Args:
         lambda_value: expected value of the poissonian distribution
         n: length of the list
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
 
     Returns:
         A list of pseudo-casual numbers generated according to a poissonian distribution with
         an expected value lambda_value
     """
 
-    random_list = []
-    for j in range(n):
-        i = 0
-        delta = 0
-        while delta <= lambda_value:
-            n = -(np.log(1 - random.random()))
-            delta = delta + n
-            i = i + 1
-        random_list.append(i - 1)
+    return array_ifm_poisson(lambda_value, n, seed, stream).tolist()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _log_factorial(k: np.ndarray) -> np.ndarray:
+    """
+    Calculation of the logarithm of the factorial of an array of non-negative integers, tabulated for
+    k < 10 and computed with the Stirling series otherwise
+
+    Args:
+        k: array of non-negative integers
+
+    Returns:
+        The array of the logarithms of k!
+    """
+
+    x = np.asarray(k, dtype=float) + 1.
+    inv = 1. / x
+    inv2 = inv * inv
+    stirling = ((x - 0.5) * np.log(x) - x + 0.5 * math.log(2. * math.pi)
+                + inv * (1. / 12. - inv2 * (1. / 360. - inv2 / 1260.)))
+    small = x < _LOG_FACTORIAL.size + 1
+    return np.where(small, _LOG_FACTORIAL[np.where(small, x, 1.).astype(np.int64) - 1], stirling)
 
-    return random_list
+
+_LOG_FACTORIAL = np.array([math.lgamma(k + 1.) for k in range(10)])
+
+# expected value above which the poissonian generator switches from inversion to transformed rejection
+_POISSON_PTRS_LIMIT = 10.
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def tac_box(function,
-            x_minimum: float,
-            x_maximum: float,
-            y_minimum: float,
-            y_maximum: float,
-            seed: float = 0.) -> float:
+def _poisson_inversion(lambda_values: np.ndarray,
+                       generator: np.random.Generator) -> np.ndarray:
     """
-    Generation of a pseudo-casual number distributed accordingly to a function
-    with the try-an-catch algorithm, into a "box" delimited by x_minimum and x_maximum for the
-    horizontal axis and y_minimum and y_maximum for the vertical axis starting from an optional seed
-    different from 0.
+    Generation of poissonian numbers with the inversion of the cumulative distribution, searched sequentially
+    from 0 at once for all the expected values. The number of steps grows with the expected value,
+    so the method is used only for small values
 
     Args:
-        function: the function which rules the distribution of numbers
-        x_minimum: lower limit of the range for the horizontal axis
-        x_maximum: upper limit of the range for the horizontal axis
-        y_minimum: lower limit of the range for the vertical axis
-        y_maximum: upper limit of the range for the vertical axis
-        seed: starting seed for the random generation (optional)
+        lambda_values: array of expected values, one for each number to generate
+        generator: numpy random generator
 
     Returns:
-        A single number generated with the try-an-catch algorithm distributed accordingly to the function wanted
+        An array of numbers generated according to the poissonian distributions
     """
 
-    if seed != 0.:
-        random.seed(seed)
-    x = uniform_range(x_minimum, x_maximum)
-    y = uniform_range(y_minimum, y_maximum)
-    while y > function(x):
-        x = uniform_range(x_minimum, x_maximum)
-        y = uniform_range(y_minimum, y_maximum)
-    return x
+    u = generator.random(lambda_values.size)
+    counts = np.zeros(lambda_values.size, dtype=np.int64)
+    probability = np.exp(-lambda_values)
+    cumulative = probability.copy()
+    running = np.flatnonzero(u > cumulative)
+    while running.size > 0:
+        counts[running] += 1
+        probability[running] *= lambda_values[running] / counts[running]
+        cumulative[running] += probability[running]
+        running = running[(u[running] > cumulative[running]) & (probability[running] > 0.)]
+    return counts
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _poisson_ptrs(lambda_values: np.ndarray,
+                  generator: np.random.Generator) -> np.ndarray:
+    """
+    Generation of poissonian numbers with the transformed rejection method with squeeze (PTRS, W. Hormann 1993),
+    applied at once to all the expected values. The acceptance rate is above 0.9 for any expected value
+    larger than 10, so the cost does not depend on the expected value
+
+    Args:
+        lambda_values: array of expected values (not smaller than 10), one for each number to generate
+        generator: numpy random generator
+
+    Returns:
+        An array of numbers generated according to the poissonian distributions
+    """
+
+    counts = np.empty(lambda_values.size, dtype=np.int64)
+    log_lambda = np.log(lambda_values)
+    b = 0.931 + 2.53 * np.sqrt(lambda_values)
+    a = -0.059 + 0.02483 * b
+    log_inv_alpha = np.log(1.1239 + 1.1328 / (b - 3.4))
+    v_r = 0.9277 - 3.6224 / (b - 2.)
+
+    running = np.arange(lambda_values.size)
+    while running.size > 0:
+        u = generator.random(running.size) - 0.5
+        v = generator.random(running.size)
+        us = 0.5 - np.abs(u)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = np.floor((2. * a[running] / us + b[running]) * u + lambda_values[running] + 0.43)
+        done = (us >= 0.07) & (v <= v_r[running])
+        check = np.flatnonzero(~done & (us > 0.) & (k >= 0.) & ~((us < 0.013) & (v > us)))
+        r = running[check]
+        done[check] = (np.log(v[check]) + log_inv_alpha[r] - np.log(a[r] / (us[check] * us[check]) + b[r])
+                       <= -lambda_values[r] + k[check] * log_lambda[r] - _log_factorial(k[check]))
+        counts[running[done]] = k[done]
+        running = running[~done]
+    return counts
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_poisson(lambda_value: float | np.ndarray,
+                  n: int = None,
+                  seed: float = 0.,
+                  stream: Stream = None) -> np.ndarray:
+    """
+    Generation of pseudo-casual numbers distributed accordingly to poissonian distributions. The method is
+    chosen for each expected value: inversion of the cumulative distribution below 10 and transformed rejection
+    (PTRS) above, so the cost per number does not grow with the expected value. An array of expected values
+    generates one number for each of them in a single call, e.g. a binned toy dataset with one value per bin
+
+    Args:
+        lambda_value: expected value or array of expected values of the poissonian distributions
+        n: number of repetitions of lambda_value (optional, default: None, a single repetition)
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of integers generated according to the poissonian distributions, with the shape of lambda_value
+        or with shape (n,) + shape of lambda_value if n is specified
+    """
+
+    lambda_array = np.asarray(lambda_value, dtype=float)
+    if not np.all(np.isfinite(lambda_array) & (lambda_array >= 0.)):
+        raise ValueError('the expected value of the poissonian distribution must be finite and non-negative')
+    shape = lambda_array.shape if n is None else (n,) + lambda_array.shape
+    lambda_array = np.broadcast_to(lambda_array, shape).ravel()
+
+    generator = _generator(seed, stream)
+    counts = np.empty(lambda_array.size, dtype=np.int64)
+    small = lambda_array < _POISSON_PTRS_LIMIT
+    counts[small] = _poisson_inversion(lambda_array[small], generator)
+    counts[~small] = _poisson_ptrs(lambda_array[~small], generator)
+    return counts.reshape(shape)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def list_poisson(lambda_value: float,
+                 n: int,
+                 seed: float = 0.,
+                 stream: Stream = None) -> list[int]:
+    """
+    Generation of a list of n pseudo-casual numbers distributed accordingly to a poissonian distribution
+    with an expected value lambda_value, with a cost per number which does not grow with lambda_value
+
+    Args:
+        lambda_value: expected value of the poissonian distribution
+        n: length of the list
+        seed: starting seed for the random number generator (optional, default: 0.)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        A list of pseudo-casual numbers generated according to a poissonian distribution with
+        an expected value lambda_value
+    """
+
+    return array_poisson(lambda_value, n, seed, stream).tolist()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def tac_box(function,
+            x_minimum: float,
+            x_maximum: float,
+            y_minimum: float,
+            y_maximum: float,
+            seed: float = 0.,
+            stream: Stream = None) -> float:
+    """
+    Generation of a pseudo-casual number distributed accordingly to a function
+    with the try-an-catch algorithm, into a "box" delimited by x_minimum and x_maximum for the
+    horizontal axis and y_minimum and y_maximum for the vertical axis starting from an optional seed
+    different from 0.
+
+    Args:
+        function: the function which rules the distribution of numbers
+        x_minimum: lower limit of the range for the horizontal axis
+        x_maximum: upper limit of the range for the horizontal axis
+        y_minimum: lower limit of the range for the vertical axis
+        y_maximum: upper limit of the range for the vertical axis
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        A single number generated with the try-an-catch algorithm distributed accordingly to the function wanted
+    """
+
+    if seed != 0. and stream is None:
+        random.seed(seed)
+    x = uniform_range(x_minimum, x_maximum, stream)
+    y = uniform_range(y_minimum, y_maximum, stream)
+    while y > function(x):
+        x = uniform_range(x_minimum, x_maximum, stream)
+        y = uniform_range(y_minimum, y_maximum, stream)
+    return x
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _tac_cells(function,
+               minimum: list[float],
+               maximum: list[float],
+               n: int,
+               n_cells: list[int],
+               n_scan: int,
+               safety: float,
+               generator: np.random.Generator) -> tuple[np.ndarray, float]:
+    """
+    Try-and-catch algorithm in d dimensions with a piecewise constant envelope over a grid of cells.
+    The envelope of each cell is the maximum of the function on a scan grid with n_scan intervals per cell
+    and per dimension, including the borders of the cell, multiplied by a safety factor
+
+    Args:
+        function: the function which rules the distribution of the points [must accept an (n, d) array]
+        minimum: lower limits of the range for each dimension
+        maximum: upper limits of the range for each dimension
+        n: number of points to generate
+        n_cells: number of cells of the envelope for each dimension
+        n_scan: number of intervals used to scan the function in each cell
+        safety: factor multiplying the maximum found by the scan in each cell
+        generator: numpy random generator
+
+    Returns:
+        An (n, d) array of points and the acceptance rate of the proposed points
+    """
+
+    minimum = np.asarray(minimum, dtype=float)
+    maximum = np.asarray(maximum, dtype=float)
+    n_cells = tuple(int(c) for c in n_cells)
+    dimension = minimum.size
+    axes = [np.linspace(minimum[j], maximum[j], n_cells[j] * n_scan + 1) for j in range(dimension)]
+    shape = tuple(axis.size for axis in axes)
+    values = np.empty(math.prod(shape))
+    for start in range(0, values.size, _CHUNK_SIZE):
+        index = np.unravel_index(np.arange(start, min(start + _CHUNK_SIZE, values.size)), shape)
+        points = np.stack([axes[j][index[j]] for j in range(dimension)], axis=1)
+        values[start:start + points.shape[0]] = np.broadcast_to(np.asarray(function(points), dtype=float),
+                                                                 points.shape[:1])
+    scan_mean = values.mean()
+
+    # the maximum over a box is separable: reduce one dimension at a time
+    envelope = values.reshape(shape)
+    for j in range(dimension):
+        envelope = np.moveaxis(envelope, j, 0)
+        envelope = np.maximum(envelope[:-1].reshape((n_cells[j], n_scan) + envelope.shape[1:]).max(axis=1),
+                              envelope[n_scan::n_scan])
+        envelope = np.moveaxis(envelope, 0, j)
+    envelope = envelope.ravel() * safety
+    if not envelope.sum() > 0.:
+        raise ValueError('the function is not positive in the range')
+
+    widths = (maximum - minimum) / np.array(n_cells)
+    samples = np.empty((n, dimension))
+    accepted = 0
+    hits = 0
+    proposed = 0
+    efficiency = scan_mean / envelope.mean()
+    while accepted < n:
+        if hits > 0:
+            efficiency = hits / proposed
+        size = min(int(1.1 * (n - accepted) / efficiency) + 16, _CHUNK_SIZE)
+        cells = generator.choice(envelope.size, size, p=envelope / envelope.sum())
+        corners = minimum + np.stack(np.unravel_index(cells, n_cells), axis=1) * widths
+        x = corners + generator.random((size, dimension)) * widths
+        y = generator.random(size) * envelope[cells]
+        f = np.broadcast_to(np.asarray(function(x), dtype=float), (size,))
+        over = f > envelope[cells]
+        if over.any():
+            np.maximum.at(envelope, cells[over], f[over] * safety)
+        caught = x[y < f]
+        take = min(caught.shape[0], n - accepted)
+        samples[accepted:accepted + take] = caught[:take]
+        accepted += take
+        hits += caught.shape[0]
+        proposed += size
+    return samples, (hits / proposed if proposed > 0 else 0.)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def tac_batch(function,
+              x_minimum: float,
+              x_maximum: float,
+              n: int,
+              n_cells: int = 100,
+              n_scan: int = 10,
+              safety: float = 1.1,
+              seed: float = 0.,
+              stream: Stream = None) -> tuple[np.ndarray, float]:
+    """
+    Generation of an array of n pseudo-casual numbers distributed accordingly to a function between
+    [x_minimum, x_maximum) with the try-and-catch algorithm. The vertical box is not required: the interval is
+    divided into n_cells cells and a piecewise constant envelope is built from a coarse scan of the function,
+    taking the maximum of each cell multiplied by a safety factor. The (x, y) pairs are proposed in blocks,
+    with the cells chosen proportionally to the envelope, and the function is evaluated once per block.
+    When the function exceeds the envelope of a cell, the envelope of the cell is raised for the following blocks
+
+    Args:
+        function: the function which rules the distribution of numbers
+            [must be non-negative and accept a numpy array, returning an array of the same shape]
+        x_minimum: lower limit of the range for the horizontal axis
+        x_maximum: upper limit of the range for the horizontal axis
+        n: number of pseudo-casual numbers to generate
+        n_cells: number of cells of the envelope (optional, default: 100)
+        n_scan: number of intervals used to scan the function in each cell (optional, default: 10)
+        safety: factor multiplying the maximum found by the scan in each cell (optional, default: 1.1)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of n numbers generated with the try-and-catch algorithm distributed accordingly to the function
+        wanted and the acceptance rate of the proposed pairs
+    """
+
+    samples, acceptance = _tac_cells(lambda x: function(x[:, 0]), [x_minimum], [x_maximum], n,
+                                     [n_cells], n_scan, safety, _generator(seed, stream))
+    return samples[:, 0], acceptance
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def tac_nd(function,
+           minimum: list[float],
+           maximum: list[float],
+           n: int,
+           n_cells: int | list[int] = None,
+           n_scan: int = 2,
+           safety: float = 1.2,
+           seed: float = 0.,
+           stream: Stream = None) -> tuple[np.ndarray, float]:
+    """
+    Generation of n pseudo-casual points distributed accordingly to a function of d variables in the box
+    [minimum, maximum) with the try-and-catch algorithm. The box is divided into a grid of cells with a piecewise
+    constant envelope built from a scan of the function, and the points are proposed in blocks, with the cells
+    chosen proportionally to the envelope, as in tac_batch. For gaussian distributions use
+    array_multivariate_gauss, which does not need any rejection
+
+    Args:
+        function: the function which rules the distribution of the points
+            [must be non-negative and accept an (n, d) array of points, returning an array of n values]
+        minimum: lower limits of the box for each variable
+        maximum: upper limits of the box for each variable
+        n: number of points to generate
+        n_cells: number of cells of the envelope for each variable, a single number or one for each variable
+            (optional, default: None, chosen so that the scan uses about 2^18 points)
+        n_scan: number of intervals used to scan the function in each cell and variable (optional, default: 2)
+        safety: factor multiplying the maximum found by the scan in each cell (optional, default: 1.2)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An (n, d) array of points generated with the try-and-catch algorithm distributed accordingly to the
+        function wanted and the acceptance rate of the proposed points
+    """
+
+    dimension = len(minimum)
+    if len(maximum) != dimension:
+        raise ValueError('minimum and maximum must have the same length')
+    if n_cells is None:
+        n_cells = max(1, (int(round(2. ** (18. / dimension), 6)) - 1) // n_scan)
+    n_cells = np.broadcast_to(n_cells, (dimension,))
+    return _tac_cells(function, minimum, maximum, n, n_cells, n_scan, safety, _generator(seed, stream))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_multivariate_gauss(mean: list[float],
+                             covariance: list[list[float]] | np.ndarray,
+                             n: int,
+                             cholesky: bool = False,
+                             seed: float = 0.,
+                             stream: Stream = None) -> np.ndarray:
+    """
+    Generation of n pseudo-casual points distributed accordingly to a multivariate gaussian distribution:
+    the independent standard gaussian numbers are correlated with the Cholesky factor L of the covariance
+    matrix (covariance = L L^T), without any rejection
+
+    Args:
+        mean: mean values of the d variables
+        covariance: d x d covariance matrix, or its lower triangular Cholesky factor if cholesky is True
+        n: number of points to generate
+        cholesky: if True, covariance is already the Cholesky factor, which can be computed once with
+            np.linalg.cholesky and reused (optional, default: False)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An (n, d) array of points generated according to the multivariate gaussian distribution
+    """
+
+    mean = np.asarray(mean, dtype=float)
+    factor = np.asarray(covariance, dtype=float)
+    if not cholesky:
+        factor = np.linalg.cholesky(factor)
+    return mean + _generator(seed, stream).standard_normal((n, mean.size)) @ factor.T
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _primes(count: int) -> list[int]:
+    """
+    Calculation of the first prime numbers, used as bases of the Halton sequence
+
+    Args:
+        count: number of prime numbers
+
+    Returns:
+        A list with the first count prime numbers
+    """
+
+    primes = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % prime for prime in primes if prime * prime <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _halton_scrambling(dimension: int,
+                       generator: np.random.Generator) -> list[np.ndarray]:
+    """
+    Generation of the random digit permutations which scramble a Halton sequence: one permutation of the
+    digits for each digit position, enough to fill the precision of a float, and for each dimension
+
+    Args:
+        dimension: number of dimensions of the sequence
+        generator: numpy random generator
+
+    Returns:
+        A list with one (n_digits, base) array of permutations for each dimension
+    """
+
+    scrambling = []
+    for base in _primes(dimension):
+        n_digits = math.ceil(53. / math.log2(base))
+        scrambling.append(generator.permuted(np.tile(np.arange(base), (n_digits, 1)), axis=1))
+    return scrambling
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _halton(start: int,
+            n: int,
+            dimension: int,
+            scrambling: list[np.ndarray] = None) -> np.ndarray:
+    """
+    Calculation of the points of the Halton sequence with indices between [start, start + n): in each dimension
+    the digits of the index in a prime base are reflected around the radix point, after being permuted if the
+    scrambling is passed
+
+    Args:
+        start: index of the first point
+        n: number of points
+        dimension: number of dimensions of the sequence
+        scrambling: digit permutations returned by _halton_scrambling (optional, default: None, no scrambling)
+
+    Returns:
+        An (n, dimension) array of points in [0, 1)
+    """
+
+    index = np.arange(start, start + n, dtype=np.int64)
+    points = np.empty((n, dimension))
+    for j, base in enumerate(_primes(dimension)):
+        value = np.zeros(n)
+        rest = index.copy()
+        factor = 1. / base
+        if scrambling is None:
+            while rest.any():
+                value += (rest % base) * factor
+                rest //= base
+                factor /= base
+        else:
+            for permutation in scrambling[j]:
+                value += permutation[rest % base] * factor
+                rest //= base
+                factor /= base
+        points[:, j] = value
+    return np.minimum(points, np.nextafter(1., 0.))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_halton(n: int,
+                 dimension: int,
+                 start: int = 0,
+                 scramble: bool = True,
+                 seed: float = 0.,
+                 stream: Stream = None) -> np.ndarray:
+    """
+    Generation of n points of the Halton low-discrepancy sequence in the unit hypercube [0, 1)^dimension.
+    The points fill the hypercube more evenly than pseudo-casual numbers, so the error of the quasi monte-carlo
+    integrals of smooth functions decreases almost as 1/n. With scramble, the digits are permuted at random
+    (random digit scrambling of Matousek), so that independent replicas of the sequence give an error estimate.
+    The scrambling of a stream is derived from its seed sequence without consuming its generator, and a non-zero
+    seed re-seeds the generator, so calls with the same stream or seed continue the same scrambled sequence;
+    with the default seed the scrambling is drawn from the shared generator and changes at each call
+
+    Args:
+        n: number of points to generate
+        dimension: number of dimensions of the points
+        start: index of the first point of the sequence, to continue a previous call with the same stream or
+            non-zero seed (optional, default: 0)
+        scramble: if True, the sequence is scrambled with random digit permutations (optional, default: True)
+        seed: starting seed for the random scrambling (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An (n, dimension) array of points in [0, 1)
+    """
+
+    scrambling = None
+    if scramble:
+        if stream is not None:
+            parent = stream.seed_sequence
+            generator = np.random.default_rng(np.random.SeedSequence(parent.entropy,
+                                                                     spawn_key=parent.spawn_key + (_HALTON_TAG,),
+                                                                     pool_size=parent.pool_size))
+        else:
+            generator = _generator(seed, stream)
+        scrambling = _halton_scrambling(dimension, generator)
+    return _halton(start, n, dimension, scrambling)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _npz_path(path: str) -> str:
+    """
+    Path of a numpy .npz file, with the extension .npz added if it is missing as np.savez does
+
+    Args:
+        path: path of the file
+
+    Returns:
+        The path ending with .npz
+    """
+
+    path = os.fspath(path)
+    return path if path.endswith('.npz') else path + '.npz'
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+class InverseCDF:
+    """
+    Tabulated inverse of the cumulative distribution of a pdf: the pdf is integrated once on a grid with the
+    trapezoid rule and the numbers are generated with the inverse function method, interpolating linearly the
+    monotone table for whole arrays of uniform numbers
+
+    Args:
+        x: grid of points between the limits of the range
+        cdf: cumulative distribution in the points of the grid, non-decreasing from 0 to 1
+    """
+
+    __slots__ = ('x', 'cdf')
+
+    def __init__(self,
+                 x: np.ndarray,
+                 cdf: np.ndarray):
+        self.x = np.asarray(x, dtype=float)
+        self.cdf = np.asarray(cdf, dtype=float)
+
+    @classmethod
+    def from_pdf(cls,
+                 pdf,
+                 x_minimum: float,
+                 x_maximum: float,
+                 resolution: int = 10000) -> 'InverseCDF':
+        """
+        Construction of the table of a pdf between [x_minimum, x_maximum)
+
+        Args:
+            pdf: probability density function, also not normalized
+                [must be non-negative and accept a numpy array, returning an array of the same shape]
+            x_minimum: lower limit of the range
+            x_maximum: upper limit of the range
+            resolution: number of intervals of the grid (optional, default: 10000)
+
+        Returns:
+            The table of the inverse of the cumulative distribution
+        """
+
+        x = np.linspace(x_minimum, x_maximum, resolution + 1)
+        values = np.broadcast_to(np.asarray(pdf(x), dtype=float), x.shape)
+        if np.any(values < 0.):
+            raise ValueError('the pdf must be non-negative in the interval [x_minimum, x_maximum)')
+        cdf = np.concatenate(([0.], np.cumsum(0.5 * (values[1:] + values[:-1]))))
+        if not cdf[-1] > 0.:
+            raise ValueError('the pdf is not positive in the interval [x_minimum, x_maximum)')
+        return cls(x, cdf / cdf[-1])
+
+    def __call__(self,
+                 u: float | np.ndarray) -> np.ndarray:
+        """
+        Calculation of the inverse of the cumulative distribution
+
+        Args:
+            u: probability or array of probabilities between [0, 1]
+
+        Returns:
+            The values of the variable with cumulative distribution u
+        """
+
+        return np.interp(u, self.cdf, self.x)
+
+    def sample(self,
+               n: int,
+               seed: float = 0.,
+               stream: Stream = None) -> np.ndarray:
+        """
+        Generation of an array of n pseudo-casual numbers distributed accordingly to the tabulated pdf
+
+        Args:
+            n: number of pseudo-casual numbers to generate
+            seed: starting seed for the random generation (optional)
+            stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+        Returns:
+            An array of n pseudo-casual numbers generated according to the tabulated pdf
+        """
+
+        return self(_generator(seed, stream).random(n))
+
+    def save(self,
+             path: str):
+        """
+        Saves the table into a numpy .npz file
+
+        Args:
+            path: path of the file, to which the extension .npz is added if it is missing
+        """
+
+        np.savez(_npz_path(path), x=self.x, cdf=self.cdf)
+
+    @classmethod
+    def load(cls,
+             path: str) -> 'InverseCDF':
+        """
+        Loads a table saved with save
+
+        Args:
+            path: path of the file, to which the extension .npz is added if it is missing
+
+        Returns:
+            The table of the inverse of the cumulative distribution
+        """
+
+        with np.load(_npz_path(path)) as data:
+            return cls(data['x'], data['cdf'])
+
+
+# maximum number of tables kept in memory by inverse_cdf, the least recently used are discarded
+_INVERSE_CDF_CACHE_SIZE = 32
+
+# number of points where the pdf is evaluated to identify its tables on disk
+_FINGERPRINT_POINTS = 64
+
+
+def _pdf_fingerprint(pdf,
+                     x_minimum: float,
+                     x_maximum: float) -> str:
+    """
+    Fingerprint of the content of a pdf, made of its compiled code and constants and of its values in fixed
+    points of the range, so that two pdfs with the same name (e.g. two scripts run as __main__) or a pdf which
+    has been edited do not share the tables saved on disk
+
+    Args:
+        pdf: probability density function
+        x_minimum: lower limit of the range
+        x_maximum: upper limit of the range
+
+    Returns:
+        The hexadecimal digest of the fingerprint
+    """
+
+    digest = hashlib.sha1()
+    code = getattr(pdf, '__code__', None)
+    if code is not None:
+        digest.update(code.co_code)
+        digest.update(repr(tuple(constant.co_code if isinstance(constant, type(code)) else constant
+                                 for constant in code.co_consts)).encode())
+        digest.update(repr(getattr(pdf, '__defaults__', None)).encode())
+    fractions = (np.arange(1, _FINGERPRINT_POINTS + 1) * (math.sqrt(5.) - 1.) / 2.) % 1.
+    x = x_minimum + (x_maximum - x_minimum) * fractions
+    digest.update(np.ascontiguousarray(np.broadcast_to(np.asarray(pdf(x), dtype=np.float64), x.shape)).tobytes())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=_INVERSE_CDF_CACHE_SIZE)
+def _cached_inverse_cdf(pdf,
+                        x_minimum: float,
+                        x_maximum: float,
+                        resolution: int,
+                        cache_dir: str) -> InverseCDF:
+    """
+    Construction of the table of a pdf, looked up in cache_dir before integrating the pdf
+
+    Args:
+        pdf: probability density function
+        x_minimum: lower limit of the range
+        x_maximum: upper limit of the range
+        resolution: number of intervals of the grid
+        cache_dir: directory of the tables saved on disk, or None
+
+    Returns:
+        The table of the inverse of the cumulative distribution
+    """
+
+    if cache_dir is None:
+        return InverseCDF.from_pdf(pdf, x_minimum, x_maximum, resolution)
+
+    qualname = getattr(pdf, '__qualname__', None)
+    if qualname is None or '<' in qualname:
+        raise ValueError('only pdfs which are functions defined at module level can be saved on disk')
+    name = getattr(pdf, '__module__', '') + '.' + qualname
+    key = f'{name}|{x_minimum!r}|{x_maximum!r}|{resolution}|{_pdf_fingerprint(pdf, x_minimum, x_maximum)}'
+    path = os.path.join(cache_dir, 'icdf-' + hashlib.sha1(key.encode()).hexdigest() + '.npz')
+    if os.path.exists(path):
+        return InverseCDF.load(path)
+    table = InverseCDF.from_pdf(pdf, x_minimum, x_maximum, resolution)
+    os.makedirs(cache_dir, exist_ok=True)
+    table.save(path)
+    return table
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def inverse_cdf(pdf,
+                x_minimum: float,
+                x_maximum: float,
+                resolution: int = 10000,
+                cache_dir: str = None) -> InverseCDF:
+    """
+    Returns the tabulated inverse of the cumulative distribution of a pdf between [x_minimum, x_maximum).
+    The tables are cached in memory by pdf, range and resolution, discarding the least recently used ones,
+    and optionally saved on disk, so that jobs using the same pdf do not integrate it again
+
+    Args:
+        pdf: probability density function, also not normalized
+            [must be non-negative and accept a numpy array, returning an array of the same shape]
+        x_minimum: lower limit of the range
+        x_maximum: upper limit of the range
+        resolution: number of intervals of the grid (optional, default: 10000)
+        cache_dir: directory where the tables are saved and looked up (optional, default: None, memory only)
+            [the tables on disk are identified by the module and name of the pdf, so the pdf must be a function
+            defined at module level, and by a fingerprint of its code and of its values in some points]
+
+    Returns:
+        The table of the inverse of the cumulative distribution
+    """
+
+    return _cached_inverse_cdf(pdf, float(x_minimum), float(x_maximum), int(resolution),
+                               None if cache_dir is None else os.fspath(cache_dir))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def clear_inverse_cdf_cache():
+    """
+    Removes from memory the tables cached by inverse_cdf (the tables saved on disk are kept)
+    """
+
+    _cached_inverse_cdf.cache_clear()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_inverse_cdf(pdf,
+                      x_minimum: float,
+                      x_maximum: float,
+                      n: int,
+                      resolution: int = 10000,
+                      cache_dir: str = None,
+                      seed: float = 0.,
+                      stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual numbers distributed accordingly to a pdf between
+    [x_minimum, x_maximum) with the inverse function method applied to the cached table of the pdf
+
+    Args:
+        pdf: probability density function, also not normalized
+            [must be non-negative and accept a numpy array, returning an array of the same shape]
+        x_minimum: lower limit of the range
+        x_maximum: upper limit of the range
+        n: number of pseudo-casual numbers to generate
+        resolution: number of intervals of the grid (optional, default: 10000)
+        cache_dir: directory where the tables are saved and looked up (optional, default: None, memory only)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of n pseudo-casual numbers generated according to the pdf
+    """
+
+    return inverse_cdf(pdf, x_minimum, x_maximum, resolution, cache_dir).sample(n, seed, stream)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+class AliasTable:
+    """
+    Alias table of a discrete distribution (Walker's method, with the construction of M. D. Vose 1991), built
+    once in a time proportional to the number of categories. Every number is then generated with one uniform
+    integer and one uniform number, independently of the number of categories. If the edges of the bins are
+    passed, e.g. the output of np.histogram, the numbers are distributed uniformly within the bins
+
+    Args:
+        weights: non-negative weights of the categories, also not normalized (e.g. bin contents)
+        edges: edges of the bins, with one element more than weights (optional, default: None, category indices)
+    """
+
+    __slots__ = ('probability', 'alias', 'edges')
+
+    def __init__(self,
+                 weights: list[float] | np.ndarray,
+                 edges: list[float] | np.ndarray = None):
+        weights = np.asarray(weights, dtype=float)
+        if np.any(weights < 0.) or not weights.sum() > 0.:
+            raise ValueError('the weights must be non-negative with a positive sum')
+        if edges is not None and len(edges) != weights.size + 1:
+            raise ValueError('the edges must have one element more than the weights')
+
+        k = weights.size
+        scaled = (weights * k / weights.sum()).tolist()
+        probability = [1.] * k
+        alias = list(range(k))
+        small = [i for i in range(k) if scaled[i] < 1.]
+        large = [i for i in range(k) if scaled[i] >= 1.]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.
+            if scaled[more] < 1.:
+                small.append(more)
+            else:
+                large.append(more)
+
+        self.probability = np.array(probability)
+        self.alias = np.array(alias, dtype=np.int64)
+        self.edges = None if edges is None else np.asarray(edges, dtype=float)
+
+    def sample(self,
+               n: int,
+               seed: float = 0.,
+               stream: Stream = None) -> np.ndarray:
+        """
+        Generation of an array of n pseudo-casual numbers distributed accordingly to the table
+
+        Args:
+            n: number of pseudo-casual numbers to generate
+            seed: starting seed for the random generation (optional)
+            stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+        Returns:
+            An array of n category indices or, if the edges are defined, of n numbers distributed
+            uniformly within the bins
+        """
+
+        generator = _generator(seed, stream)
+        column = generator.integers(self.probability.size, size=n)
+        index = np.where(generator.random(n) < self.probability[column], column, self.alias[column])
+        if self.edges is None:
+            return index
+        lower = self.edges[index]
+        return lower + generator.random(n) * (self.edges[index + 1] - lower)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def array_alias(weights: list[float] | np.ndarray,
+                n: int,
+                edges: list[float] | np.ndarray = None,
+                seed: float = 0.,
+                stream: Stream = None) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual numbers distributed accordingly to a discrete distribution or to
+    a histogram with the alias method. For repeated generations build an AliasTable once and call its sample
+
+    Args:
+        weights: non-negative weights of the categories, also not normalized (e.g. bin contents)
+        n: number of pseudo-casual numbers to generate
+        edges: edges of the bins, with one element more than weights (optional, default: None, category indices)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        An array of n category indices or, if the edges are passed, of n numbers distributed
+        uniformly within the bins
+    """
+
+    return AliasTable(weights, edges).sample(n, seed, stream)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+# arguments shared by all the chunks of _map_chunks, sent once to each worker process by _set_shared
+_shared_arguments = ()
+
+
+def _set_shared(arguments: tuple):
+    """
+    Stores the arguments shared by all the chunks of _map_chunks in a worker process
+
+    Args:
+        arguments: positional arguments which precede the size and the stream of each chunk
+    """
+
+    global _shared_arguments
+    _shared_arguments = arguments
+
+
+def _shared_chunk(function,
+                  size: int,
+                  stream: Stream):
+    """
+    Single chunk of _map_chunks, executed by a worker process with the shared arguments
+
+    Args:
+        function: function of the chunks
+        size: size of the chunk
+        stream: independent stream of the chunk
+
+    Returns:
+        The result of the function for the chunk
+    """
+
+    return function(*_shared_arguments, size, stream)
+
+
+def _map_chunks(function,
+                n: int,
+                chunk_size: int,
+                stream: Stream,
+                workers: int,
+                *arguments) -> list:
+    """
+    Splits n items (numbers, points, replicas) into chunks of chunk_size items and calls
+    function(*arguments, size, stream) for each chunk, in the calling process if workers is 1 or across a pool of
+    worker processes. The chunk with index i always uses the substream i of the stream and the results are
+    returned in the order of the chunks, so the result does not depend on the number of workers. The arguments
+    are sent once to each worker process instead of once for each chunk
+
+    Args:
+        function: function of the chunks [must be defined at module level, so that it can be sent to the workers]
+        n: total number of items
+        chunk_size: number of items of each chunk
+        stream: independent stream of pseudo-casual numbers
+        workers: number of worker processes, or None for the number of processors of the machine
+        *arguments: positional arguments of the function which precede the size and the stream
+
+    Returns:
+        The list of the results of the chunks
+    """
+
+    sizes = [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+    streams = [stream.substream(i) for i in range(len(sizes))]
+    if workers == 1 or len(sizes) <= 1:
+        return [function(*arguments, size, chunk_stream) for size, chunk_stream in zip(sizes, streams)]
+    # imported here: the process pool loads multiprocessing, which is not needed by serial jobs
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=_set_shared, initargs=(arguments,)) as executor:
+        return list(executor.map(_shared_chunk, repeat(function), sizes, streams))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _generate_chunk(function,
+                    args: tuple,
+                    kwargs: dict,
+                    n: int,
+                    stream: Stream) -> np.ndarray:
+    """
+    Generation of a single chunk of the parallel driver, executed by _map_chunks
+
+    Args:
+        function: array generator to call
+        args: positional arguments of the generator
+        kwargs: keyword arguments of the generator
+        n: length of the chunk
+        stream: independent stream of the chunk
+
+    Returns:
+        The array generated for the chunk
+    """
+
+    return function(*args, n=n, stream=stream, **kwargs)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def parallel_generate(function,
+                      n: int,
+                      *args,
+                      stream: Stream = None,
+                      workers: int = None,
+                      chunk_size: int = _CHUNK_SIZE,
+                      **kwargs) -> np.ndarray:
+    """
+    Generation of an array of n pseudo-casual numbers with one of the array_* generators, split across a
+    pool of worker processes. The sample is divided into chunks of chunk_size numbers and the chunk with index i
+    is always generated with the substream i of the stream, so the result is bit-identical for any number of
+    workers
+
+    Args:
+        function: array generator accepting the keyword arguments n and stream, e.g. array_uniform_range
+            [must be defined at module level, so that it can be sent to the worker processes]
+        n: number of pseudo-casual numbers to generate
+        *args: positional arguments of the generator which precede n, e.g. minimum and maximum
+        stream: independent stream of pseudo-casual numbers (optional, default: None, fresh entropy)
+        workers: number of worker processes (optional, default: None, number of processors of the machine)
+        chunk_size: length of the chunks generated by each task (optional, default: 2^20)
+        **kwargs: other keyword arguments of the generator
+
+    Returns:
+        An array of n pseudo-casual numbers generated by the function
+    """
+
+    if stream is None:
+        stream = Stream()
+    chunks = _map_chunks(_generate_chunk, n, chunk_size, stream, workers, function, args, kwargs)
+    if len(chunks) == 0:
+        return function(*args, n=0, stream=stream, **kwargs)
+    return np.concatenate(chunks)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def iter_generate(function,
+                  n: int,
+                  *args,
+                  stream: Stream = None,
+                  chunk_size: int = _CHUNK_SIZE,
+                  start: int = 0,
+                  **kwargs) -> Iterator[np.ndarray]:
+    """
+    Generation of n pseudo-casual numbers with one of the array_* generators, yielded in chunks of chunk_size
+    numbers so that the memory used does not depend on n. The chunk with index i is generated with the substream i
+    of the stream, as in parallel_generate, so the concatenated chunks are identical to its output and the
+    generation can be resumed from any offset
+
+    Args:
+        function: array generator accepting the keyword arguments n and stream, e.g. array_uniform_range
+        n: number of pseudo-casual numbers to generate
+        *args: positional arguments of the generator which precede n, e.g. minimum and maximum
+        stream: independent stream of pseudo-casual numbers (optional, default: None, fresh entropy)
+        chunk_size: length of the chunks (optional, default: 2^20)
+        start: index of the first number to yield, to resume an interrupted generation (optional, default: 0)
+        **kwargs: other keyword arguments of the generator
+
+    Returns:
+        An iterator over the arrays of the chunks
+    """
+
+    if stream is None:
+        stream = Stream()
+    first = start // chunk_size
+    for index, chunk_start in enumerate(range(first * chunk_size, n, chunk_size), first):
+        chunk = _generate_chunk(function, args, kwargs, min(chunk_size, n - chunk_start), stream.substream(index))
+        if chunk_start < start:
+            chunk = chunk[start - chunk_start:]
+        yield chunk
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _write_offset(offset_path: str,
+                  offset: int):
+    """
+    Writes atomically the number of values already saved by save_generate
+
+    Args:
+        offset_path: path of the file of the offset
+        offset: number of values saved
+    """
+
+    with open(offset_path + '.tmp', 'w') as offset_file:
+        offset_file.write(str(offset))
+    os.replace(offset_path + '.tmp', offset_path)
+
+
+def save_generate(path: str,
+                  function,
+                  n: int,
+                  *args,
+                  stream: Stream,
+                  chunk_size: int = _CHUNK_SIZE,
+                  dtype=np.float64,
+                  **kwargs) -> np.ndarray:
+    """
+    Generation of n pseudo-casual numbers with one of the array_* generators, written chunk by chunk into a numpy
+    .npy file mapped in memory, so that the memory used does not depend on n. The number of values written is
+    saved in the file path + '.offset' after each chunk: if the job is interrupted, calling the function again
+    with the same arguments and a stream with the same seed resumes the generation from that offset.
+    The file path + '.offset' is removed when the generation is complete, and a complete file is returned
+    without generating it again
+
+    Args:
+        path: path of the .npy file
+        function: array generator accepting the keyword arguments n and stream, e.g. array_uniform_range
+        n: number of pseudo-casual numbers to generate
+        *args: positional arguments of the generator which precede n, e.g. minimum and maximum
+        stream: independent stream of pseudo-casual numbers, e.g. Stream(seed)
+        chunk_size: length of the chunks (optional, default: 2^20)
+        dtype: type of the numbers saved in the file (optional, default: np.float64)
+        **kwargs: other keyword arguments of the generator
+
+    Returns:
+        The array of the n numbers, mapped in memory in read-only mode
+    """
+
+    offset_path = os.fspath(path) + '.offset'
+    if os.path.exists(path) and os.path.exists(offset_path):
+        output = np.lib.format.open_memmap(path, mode='r+')
+        if output.shape != (n,) or output.dtype != np.dtype(dtype):
+            raise ValueError('the file to resume does not match the requested sample')
+        with open(offset_path) as offset_file:
+            start = int(offset_file.read())
+    elif os.path.exists(path):
+        output = np.load(path, mmap_mode='r')
+        if output.shape != (n,) or output.dtype != np.dtype(dtype):
+            raise ValueError('the complete file does not match the requested sample')
+        return output
+    else:
+        # the offset is written before the file is created, so that a file without offset is always complete
+        start = 0
+        _write_offset(offset_path, start)
+        output = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n,))
+
+    for chunk in iter_generate(function, n, *args, stream=stream, chunk_size=chunk_size, start=start, **kwargs):
+        output[start:start + chunk.size] = chunk
+        output.flush()
+        start += chunk.size
+        _write_offset(offset_path, start)
+    del output
+
+    if os.path.exists(offset_path):
+        os.remove(offset_path)
+    return np.load(path, mmap_mode='r')
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
@@ -1,12 +1,39 @@
-from spl.generate import uniform_range, list_uniform_range
+import numpy as np
+from functools import lru_cache
+from spl.generate import Stream, uniform_range, list_uniform_range, _generator, _halton, _halton_scrambling, \
+    _map_chunks
 from math import sqrt
 
 
+# number of points evaluated at once by the integrators working on arrays
+_BLOCK_SIZE = 1 << 20
+
+
+def _evaluate(function,
+              points: np.ndarray) -> np.ndarray:
+    """
+    Evaluation of a vectorized function on an array of points
+
+    Args:
+        function: function accepting a numpy array of points
+        points: array of n points, with shape (n,) or (n, d)
+
+    Returns:
+        An array of n float values, also when the function returns a constant
+    """
+
+    return np.broadcast_to(np.asarray(function(points), dtype=float), points.shape[:1])
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
 def hom(function,
         xmin: float,
         xmax: float,
         ymax: float,
-        n_evt: int = 100000) -> tuple[float, float]:
+        n_evt: int = 100000,
+        stream: Stream = None) -> tuple[float, float]:
     """
     Calculation of a defined integral of a function using the hit-or-miss method
 
@@ -16,13 +43,14 @@ def hom(function,
         xmax: upper limit of the integral
         ymax: maximum value of the function in the interval
         n_evt: number of points generated to calculate the integral (optional, default: 100000)
+        stream: independent stream of pseudo-casual numbers (optional, default: None, global generator)
 
     Returns:
         The defined integral and the uncertainty of the value obtained
     """
 
-    x_coord = list_uniform_range(xmin, xmax, n_evt)
-    y_coord = list_uniform_range(0., ymax, n_evt)
+    x_coord = list_uniform_range(xmin, xmax, n_evt, stream=stream)
+    y_coord = list_uniform_range(0., ymax, n_evt, stream=stream)
 
     points_under = 0
     for x, y in zip(x_coord, y_coord):
@@ -42,7 +70,8 @@ def hom(function,
 def crude_mc(function,
              xmin: float,
              xmax: float,
-             n_evt: int = 100000) -> tuple[float, float]:
+             n_evt: int = 100000,
+             stream: Stream = None) -> tuple[float, float]:
     """
     Calculation of a defined integral of a function using the crude monte-carlo method
 
@@ -51,6 +80,7 @@ def crude_mc(function,
         xmin: lower limit of the integral
         xmax: upper limit of the integral
         n_evt: number of repetitions used to calculate the integral (optional, default: 100000)
+        stream: independent stream of pseudo-casual numbers (optional, default: None, global random module)
 
     Returns:
         The defined integral and the uncertainty of the value obtained
@@ -59,7 +89,7 @@ def crude_mc(function,
     summ = 0.
     squared_summ = 0.
     for i in range(n_evt):
-        x = uniform_range(xmin, xmax)
+        x = uniform_range(xmin, xmax, stream)
         summ += function(x)
         squared_summ += function(x) * function(x)
 
@@ -71,3 +101,1014 @@ def crude_mc(function,
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def hom_array(function,
+              xmin: float,
+              xmax: float,
+              ymax: float,
+              n_evt: int = 100000,
+              block_size: int = _BLOCK_SIZE,
+              seed: float = 0.,
+              stream: Stream = None) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function using the hit-or-miss method, evaluating the function
+    on blocks of points so that the memory used does not depend on n_evt. It returns the same result as hom
+
+    Args:
+        function: function whose integral has to be calculated
+            [must be expressed in the form function(x) and accept a numpy array, returning an array]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        ymax: maximum value of the function in the interval
+        n_evt: number of points generated to calculate the integral (optional, default: 100000)
+        block_size: number of points evaluated at once (optional, default: 2^20)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The defined integral and the uncertainty of the value obtained
+    """
+
+    generator = _generator(seed, stream)
+    points_under = 0
+    for start in range(0, n_evt, block_size):
+        size = min(block_size, n_evt - start)
+        x = xmin + generator.random(size) * (xmax - xmin)
+        y = generator.random(size) * ymax
+        points_under += int(np.count_nonzero(_evaluate(function, x) > y))
+
+    area_rect = (xmax - xmin) * ymax
+    frac = float(points_under) / float(n_evt)
+    integral = area_rect * frac
+    integral_unc = area_rect ** 2 * frac * (1 - frac) / n_evt
+    return integral, sqrt(integral_unc)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def crude_mc_array(function,
+                   xmin: float,
+                   xmax: float,
+                   n_evt: int = 100000,
+                   block_size: int = _BLOCK_SIZE,
+                   seed: float = 0.,
+                   stream: Stream = None) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function using the crude monte-carlo method, evaluating the function
+    once on blocks of points and accumulating the sums with numpy, so that the memory used does not depend
+    on n_evt. It returns the same result as crude_mc
+
+    Args:
+        function: function whose integral has to be calculated
+            [must be expressed in the form function(x) and accept a numpy array, returning an array]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        n_evt: number of repetitions used to calculate the integral (optional, default: 100000)
+        block_size: number of points evaluated at once (optional, default: 2^20)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The defined integral and the uncertainty of the value obtained
+    """
+
+    generator = _generator(seed, stream)
+    summ = 0.
+    squared_summ = 0.
+    for start in range(0, n_evt, block_size):
+        size = min(block_size, n_evt - start)
+        values = _evaluate(function, xmin + generator.random(size) * (xmax - xmin))
+        summ += float(np.sum(values))
+        squared_summ += float(np.dot(values, values))
+
+    mean = summ / float(n_evt)
+    variance = squared_summ / float(n_evt) - mean * mean
+    variance = max(variance * (n_evt - 1) / n_evt, 0.)
+    length = (xmax - xmin)
+    return mean * length, sqrt(variance / float(n_evt)) * length
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _limits(xmin: float | list[float],
+            xmax: float | list[float]) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Conversion of the limits of an integral in one or more dimensions into arrays
+
+    Args:
+        xmin: lower limit of the integral, or list of the lower limits for each variable
+        xmax: upper limit of the integral, or list of the upper limits for each variable
+
+    Returns:
+        The arrays of the lower and upper limits and True if the integral is in one variable given by scalars
+    """
+
+    lower = np.atleast_1d(np.asarray(xmin, dtype=float))
+    upper = np.atleast_1d(np.asarray(xmax, dtype=float))
+    if lower.ndim != 1 or lower.shape != upper.shape:
+        raise ValueError('xmin and xmax must be numbers or lists of the same length')
+    return lower, upper, np.ndim(xmin) == 0
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _vegas_refine(edges: np.ndarray,
+                  weights: np.ndarray,
+                  alpha: float) -> np.ndarray:
+    """
+    Refinement of the grid of one variable of the vegas algorithm: the bins are redistributed so that each new
+    bin contains the same share of the smoothed and compressed weights of the old bins
+
+    Args:
+        edges: edges of the bins in the unit interval
+        weights: sum of the squared weighted values of the function in each bin
+        alpha: compression of the weights, 0 leaves the grid unchanged
+
+    Returns:
+        The edges of the refined bins
+    """
+
+    n_bins = weights.size
+    if n_bins < 2 or not weights.sum() > 0.:
+        return edges
+    smooth = np.empty(n_bins)
+    smooth[0] = 0.5 * (weights[0] + weights[1])
+    smooth[-1] = 0.5 * (weights[-2] + weights[-1])
+    smooth[1:-1] = (weights[:-2] + weights[1:-1] + weights[2:]) / 3.
+    ratio = smooth / smooth.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        importance = np.where((ratio > 0.) & (ratio < 1.), ((ratio - 1.) / np.log(ratio)) ** alpha, ratio)
+    if not importance.sum() > 0.:
+        return edges
+    cumulative = np.concatenate(([0.], np.cumsum(importance)))
+    refined = np.interp(np.linspace(0., cumulative[-1], n_bins + 1), cumulative, edges)
+    refined[0], refined[-1] = 0., 1.
+    return refined
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def vegas(function,
+          xmin: float | list[float],
+          xmax: float | list[float],
+          n_evt: int = 10000,
+          n_iter: int = 5,
+          n_warmup: int = 3,
+          n_bins: int = 50,
+          alpha: float = 1.5,
+          seed: float = 0.,
+          stream: Stream = None) -> tuple[float, float, float]:
+    """
+    Calculation of a defined integral of a function in one or more variables with the adaptive importance
+    sampling of the vegas algorithm (G. P. Lepage 1978). The points are generated on a separable grid with
+    n_bins bins for each variable, refined at every iteration so that the bins are narrower where the
+    function is larger. The first n_warmup iterations only adapt the grid, the following n_iter
+    iterations are combined with weights equal to the inverse of their variance
+
+    Args:
+        function: function whose integral has to be calculated
+            [must accept a numpy array of n points, with shape (n,) if the limits are numbers or (n, d)
+            if they are lists, returning an array of n values]
+        xmin: lower limit of the integral, or list of the lower limits for each variable
+        xmax: upper limit of the integral, or list of the upper limits for each variable
+        n_evt: number of points generated at each iteration (optional, default: 10000)
+        n_iter: number of iterations combined into the result (optional, default: 5)
+        n_warmup: number of iterations used only to adapt the grid (optional, default: 3)
+        n_bins: number of bins of the grid for each variable (optional, default: 50)
+        alpha: speed of the adaptation of the grid, 0 for no adaptation (optional, default: 1.5)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The defined integral, the uncertainty of the value obtained and the chi-squared per degree of freedom
+        of the combined iterations, which should be close to 1 if the iterations are consistent
+    """
+
+    lower, upper, scalar = _limits(xmin, xmax)
+    dimension = lower.size
+    volume = float(np.prod(upper - lower))
+    generator = _generator(seed, stream)
+    edges = np.tile(np.linspace(0., 1., n_bins + 1), (dimension, 1))
+    columns = np.arange(dimension)
+
+    estimates = []
+    variances = []
+    for iteration in range(n_warmup + n_iter):
+        position = generator.random((n_evt, dimension)) * n_bins
+        index = np.minimum(position.astype(np.int64), n_bins - 1)
+        widths = np.diff(edges, axis=1)[columns, index]
+        unit = edges[columns, index] + (position - index) * widths
+        jacobian = volume * np.prod(widths * n_bins, axis=1)
+        x = lower + unit * (upper - lower)
+        values = _evaluate(function, x[:, 0] if scalar else x) * jacobian
+
+        if iteration >= n_warmup:
+            estimates.append(float(np.mean(values)))
+            variances.append(float(np.var(values, ddof=1)) / n_evt)
+        squared = values * values
+        for j in range(dimension):
+            edges[j] = _vegas_refine(edges[j], np.bincount(index[:, j], weights=squared, minlength=n_bins), alpha)
+
+    estimates = np.array(estimates)
+    variances = np.array(variances)
+    if np.any(variances == 0.):
+        return float(np.mean(estimates[variances == 0.])), 0., 0.
+    weights = 1. / variances
+    integral = float(np.sum(weights * estimates) / np.sum(weights))
+    chi2_dof = float(np.sum((estimates - integral) ** 2 * weights) / (n_iter - 1)) if n_iter > 1 else 0.
+    return integral, sqrt(1. / np.sum(weights)), chi2_dof
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def qmc(function,
+        xmin: float | list[float],
+        xmax: float | list[float],
+        n_evt: int = 16384,
+        n_rep: int = 16,
+        block_size: int = _BLOCK_SIZE,
+        seed: float = 0.,
+        stream: Stream = None) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function in one or more variables with the quasi monte-carlo method:
+    the function is averaged over the points of n_rep independently scrambled Halton sequences of n_evt points.
+    The integral is the mean of the replicas and the uncertainty is the standard error of their spread. For smooth
+    functions the uncertainty decreases almost as 1/n_evt instead of 1/sqrt(n_evt)
+
+    Args:
+        function: function whose integral has to be calculated
+            [must accept a numpy array of n points, with shape (n,) if the limits are numbers or (n, d)
+            if they are lists, returning an array of n values]
+        xmin: lower limit of the integral, or list of the lower limits for each variable
+        xmax: upper limit of the integral, or list of the upper limits for each variable
+        n_evt: number of points of each replica (optional, default: 16384)
+        n_rep: number of independent replicas, at least 2 (optional, default: 16)
+        block_size: number of points evaluated at once (optional, default: 2^20)
+        seed: starting seed for the random scrambling (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The defined integral and the uncertainty of the value obtained
+    """
+
+    lower, upper, scalar = _limits(xmin, xmax)
+    dimension = lower.size
+    volume = float(np.prod(upper - lower))
+    generator = _generator(seed, stream)
+
+    estimates = np.empty(n_rep)
+    for replica in range(n_rep):
+        scrambling = _halton_scrambling(dimension, generator)
+        summ = 0.
+        for start in range(0, n_evt, block_size):
+            x = lower + _halton(start, min(block_size, n_evt - start), dimension, scrambling) * (upper - lower)
+            summ += float(np.sum(_evaluate(function, x[:, 0] if scalar else x)))
+        estimates[replica] = volume * summ / n_evt
+    return float(np.mean(estimates)), float(np.std(estimates, ddof=1) / sqrt(n_rep))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _mc_target(weighted_values,
+               generator: np.random.Generator,
+               abs_tol: float,
+               rel_tol: float,
+               max_evt: int,
+               n_start: int,
+               growth: float,
+               bound: float = None) -> tuple[float, float, int]:
+    """
+    Monte-carlo estimate of an integral with batches of growing size, updating the running mean and variance
+    (merged batch by batch with the formulas of Chan, Golub and LeVeque) until the uncertainty reaches the
+    target or the number of evaluations reaches the budget. Each batch is at most growth times the previous one.
+    While all the estimates are equal the sample variance says nothing about the regions not yet hit, so the
+    uncertainty is floored with the rule of three, 3 * bound / count (3 * |mean| / count without a bound,
+    infinite while all the estimates are zero)
+
+    Args:
+        weighted_values: function of a numpy generator and a number of points, returning the array of the
+            estimates of the integral given by each point
+        generator: numpy random generator
+        abs_tol: target absolute uncertainty, or None
+        rel_tol: target uncertainty relative to the integral, or None
+        max_evt: maximum number of evaluations of the function
+        n_start: number of points of the first batch
+        growth: ratio between the sizes of consecutive batches
+        bound: largest absolute value of the estimate given by a point, or None if unknown
+
+    Returns:
+        The defined integral, the uncertainty of the value obtained and the number of evaluations used
+    """
+
+    if abs_tol is None and rel_tol is None:
+        raise ValueError('at least one between abs_tol and rel_tol must be specified')
+    if max_evt < 2:
+        raise ValueError('max_evt must be at least 2 to estimate the uncertainty')
+    if n_start < 1:
+        raise ValueError('n_start must be positive')
+    count = 0
+    mean = 0.
+    m2 = 0.
+    size = min(n_start, max_evt)
+    while size > 0:
+        values = weighted_values(generator, size)
+        batch_mean = float(np.mean(values))
+        batch_m2 = float(np.sum((values - batch_mean) ** 2))
+        delta = batch_mean - mean
+        total = count + size
+        mean += delta * size / total
+        m2 += batch_m2 + delta * delta * count * size / total
+        count = total
+
+        uncertainty = sqrt(m2 / (count - 1) / count) if count > 1 else float('inf')
+        scale = bound if bound is not None else abs(mean)
+        if m2 == 0. and count > 1:
+            uncertainty = 3. * scale / count if scale > 0. else float('inf')
+        target = min(abs_tol if abs_tol is not None else float('inf'),
+                     rel_tol * abs(mean) if rel_tol is not None else float('inf'))
+        if uncertainty <= target:
+            break
+        # the next batch is sized to reach the target, if the variance is already well estimated
+        if target <= 0. or count < 2:
+            needed = float('inf')
+        elif m2 == 0.:
+            needed = 3. * scale / target if scale > 0. else float('inf')
+        else:
+            needed = m2 / (count - 1) / (target * target)
+        size = min(max(int(min(needed, 2. * max_evt)) + 1 - count, n_start), int(size * growth),
+                   max_evt - count, _BLOCK_SIZE)
+    return mean, uncertainty, count
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def hom_target(function,
+               xmin: float,
+               xmax: float,
+               ymax: float,
+               abs_tol: float = None,
+               rel_tol: float = None,
+               max_evt: int = 10000000,
+               n_start: int = 1000,
+               growth: float = 2.,
+               seed: float = 0.,
+               stream: Stream = None) -> tuple[float, float, int]:
+    """
+    Calculation of a defined integral of a function using the hit-or-miss method, generating batches of points
+    of growing size until the uncertainty reaches the absolute or relative target, or the budget is used
+
+    Args:
+        function: function whose integral has to be calculated
+            [must be expressed in the form function(x) and accept a numpy array, returning an array]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        ymax: maximum value of the function in the interval
+        abs_tol: target absolute uncertainty (optional, default: None)
+        rel_tol: target uncertainty relative to the integral (optional, default: None)
+        max_evt: maximum number of points generated (optional, default: 10^7)
+        n_start: number of points of the first batch (optional, default: 1000)
+        growth: ratio between the sizes of consecutive batches (optional, default: 2.)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The defined integral, the uncertainty of the value obtained and the number of points used
+    """
+
+    area_rect = (xmax - xmin) * ymax
+
+    def weighted_values(generator, size):
+        x = xmin + generator.random(size) * (xmax - xmin)
+        y = generator.random(size) * ymax
+        return area_rect * (_evaluate(function, x) > y)
+
+    return _mc_target(weighted_values, _generator(seed, stream), abs_tol, rel_tol, max_evt, n_start, growth,
+                      bound=abs(area_rect))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def crude_mc_target(function,
+                    xmin: float,
+                    xmax: float,
+                    abs_tol: float = None,
+                    rel_tol: float = None,
+                    max_evt: int = 10000000,
+                    n_start: int = 1000,
+                    growth: float = 2.,
+                    seed: float = 0.,
+                    stream: Stream = None) -> tuple[float, float, int]:
+    """
+    Calculation of a defined integral of a function using the crude monte-carlo method, generating batches of
+    points of growing size until the uncertainty reaches the absolute or relative target, or the budget is used
+
+    Args:
+        function: function whose integral has to be calculated
+            [must be expressed in the form function(x) and accept a numpy array, returning an array]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        abs_tol: target absolute uncertainty (optional, default: None)
+        rel_tol: target uncertainty relative to the integral (optional, default: None)
+        max_evt: maximum number of evaluations of the function (optional, default: 10^7)
+        n_start: number of points of the first batch (optional, default: 1000)
+        growth: ratio between the sizes of consecutive batches (optional, default: 2.)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The defined integral, the uncertainty of the value obtained and the number of evaluations used
+    """
+
+    length = xmax - xmin
+
+    def weighted_values(generator, size):
+        return length * _evaluate(function, xmin + generator.random(size) * length)
+
+    return _mc_target(weighted_values, _generator(seed, stream), abs_tol, rel_tol, max_evt, n_start, growth)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+class MCPartial:
+    """
+    Partial result of a monte-carlo integral: number of points, sum and sum of the squares of the estimates
+    of the integral given by each point (length * f(x) for the crude monte-carlo method, area * (1 or 0)
+    for the hit-or-miss method). Partial results of independent points of the same integral, computed
+    by different processes or batch jobs, are combined exactly with merge or with the + operator
+
+    Args:
+        count: number of points (optional, default: 0)
+        summ: sum of the estimates of the integral (optional, default: 0.)
+        squared_summ: sum of the squares of the estimates of the integral (optional, default: 0.)
+    """
+
+    __slots__ = ('count', 'summ', 'squared_summ')
+
+    def __init__(self,
+                 count: int = 0,
+                 summ: float = 0.,
+                 squared_summ: float = 0.):
+        self.count = count
+        self.summ = summ
+        self.squared_summ = squared_summ
+
+    def __repr__(self) -> str:
+        return f'MCPartial(count={self.count}, summ={self.summ!r}, squared_summ={self.squared_summ!r})'
+
+    def merge(self,
+              other: 'MCPartial') -> 'MCPartial':
+        """
+        Combination of two partial results
+
+        Args:
+            other: partial result of other points of the same integral
+
+        Returns:
+            The partial result of all the points
+        """
+
+        return MCPartial(self.count + other.count, self.summ + other.summ, self.squared_summ + other.squared_summ)
+
+    __add__ = merge
+
+    def result(self) -> tuple[float, float]:
+        """
+        Calculation of the integral from the partial result
+
+        Returns:
+            The defined integral and the uncertainty of the value obtained
+        """
+
+        mean = self.summ / self.count
+        variance = self.squared_summ / self.count - mean * mean
+        return mean, sqrt(max(variance, 0.) / self.count)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def hom_partial(function,
+                xmin: float,
+                xmax: float,
+                ymax: float,
+                n_evt: int = 100000,
+                block_size: int = _BLOCK_SIZE,
+                seed: float = 0.,
+                stream: Stream = None) -> MCPartial:
+    """
+    Partial result of a defined integral of a function using the hit-or-miss method, to be merged with
+    the partial results of other processes or batch jobs
+
+    Args:
+        function: function whose integral has to be calculated
+            [must be expressed in the form function(x) and accept a numpy array, returning an array]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        ymax: maximum value of the function in the interval
+        n_evt: number of points generated (optional, default: 100000)
+        block_size: number of points evaluated at once (optional, default: 2^20)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The partial result of the points generated
+    """
+
+    generator = _generator(seed, stream)
+    points_under = 0
+    for start in range(0, n_evt, block_size):
+        size = min(block_size, n_evt - start)
+        x = xmin + generator.random(size) * (xmax - xmin)
+        y = generator.random(size) * ymax
+        points_under += int(np.count_nonzero(_evaluate(function, x) > y))
+    area_rect = (xmax - xmin) * ymax
+    return MCPartial(n_evt, area_rect * points_under, area_rect * area_rect * points_under)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def crude_mc_partial(function,
+                     xmin: float,
+                     xmax: float,
+                     n_evt: int = 100000,
+                     block_size: int = _BLOCK_SIZE,
+                     seed: float = 0.,
+                     stream: Stream = None) -> MCPartial:
+    """
+    Partial result of a defined integral of a function using the crude monte-carlo method, to be merged with
+    the partial results of other processes or batch jobs
+
+    Args:
+        function: function whose integral has to be calculated
+            [must be expressed in the form function(x) and accept a numpy array, returning an array]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        n_evt: number of repetitions (optional, default: 100000)
+        block_size: number of points evaluated at once (optional, default: 2^20)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The partial result of the points generated
+    """
+
+    generator = _generator(seed, stream)
+    length = xmax - xmin
+    summ = 0.
+    squared_summ = 0.
+    for start in range(0, n_evt, block_size):
+        values = length * _evaluate(function, xmin + generator.random(min(block_size, n_evt - start)) * length)
+        summ += float(np.sum(values))
+        squared_summ += float(np.dot(values, values))
+    return MCPartial(n_evt, summ, squared_summ)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _partial_chunk(partial_function,
+                   args: tuple,
+                   n_evt: int,
+                   stream: Stream) -> MCPartial:
+    """
+    Partial result of a single chunk of the parallel integrators, executed by _map_chunks
+
+    Args:
+        partial_function: hom_partial or crude_mc_partial
+        args: positional arguments of the function which precede n_evt
+        n_evt: number of points of the chunk
+        stream: independent stream of the chunk
+
+    Returns:
+        The partial result of the chunk
+    """
+
+    return partial_function(*args, n_evt=n_evt, stream=stream)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _parallel_partial(partial_function,
+                      args: tuple,
+                      n_evt: int,
+                      workers: int,
+                      chunk_size: int,
+                      stream: Stream) -> MCPartial:
+    """
+    Partial result of n_evt points split into chunks of chunk_size points across a pool of worker processes.
+    The chunk with index i uses the substream i of the stream and the chunks are merged in order,
+    so the result does not depend on the number of workers
+
+    Args:
+        partial_function: hom_partial or crude_mc_partial
+        args: positional arguments of the function which precede n_evt
+        n_evt: number of points
+        workers: number of worker processes, or None for the number of processors of the machine
+        chunk_size: number of points of each chunk
+        stream: independent stream of pseudo-casual numbers, or None for fresh entropy
+
+    Returns:
+        The partial result of all the points
+    """
+
+    if stream is None:
+        stream = Stream()
+    partials = _map_chunks(_partial_chunk, n_evt, chunk_size, stream, workers, partial_function, args)
+    total = MCPartial()
+    for partial in partials:
+        total = total.merge(partial)
+    return total
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def hom_parallel(function,
+                 xmin: float,
+                 xmax: float,
+                 ymax: float,
+                 n_evt: int = 100000,
+                 workers: int = None,
+                 chunk_size: int = _BLOCK_SIZE,
+                 stream: Stream = None) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function using the hit-or-miss method, with the points split
+    across a pool of worker processes with independent streams. The result is the same for any number of workers
+
+    Args:
+        function: function whose integral has to be calculated
+            [must be expressed in the form function(x), accept a numpy array, returning an array,
+            and be defined at module level, so that it can be sent to the worker processes]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        ymax: maximum value of the function in the interval
+        n_evt: number of points generated to calculate the integral (optional, default: 100000)
+        workers: number of worker processes (optional, default: None, number of processors of the machine)
+        chunk_size: number of points of the task of each worker (optional, default: 2^20)
+        stream: independent stream of pseudo-casual numbers (optional, default: None, fresh entropy)
+
+    Returns:
+        The defined integral and the uncertainty of the value obtained
+    """
+
+    return _parallel_partial(hom_partial, (function, xmin, xmax, ymax), n_evt, workers, chunk_size, stream).result()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def crude_mc_parallel(function,
+                      xmin: float,
+                      xmax: float,
+                      n_evt: int = 100000,
+                      workers: int = None,
+                      chunk_size: int = _BLOCK_SIZE,
+                      stream: Stream = None) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function using the crude monte-carlo method, with the points split
+    across a pool of worker processes with independent streams. The result is the same for any number of workers
+
+    Args:
+        function: function whose integral has to be calculated
+            [must be expressed in the form function(x), accept a numpy array, returning an array,
+            and be defined at module level, so that it can be sent to the worker processes]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        n_evt: number of repetitions used to calculate the integral (optional, default: 100000)
+        workers: number of worker processes (optional, default: None, number of processors of the machine)
+        chunk_size: number of points of the task of each worker (optional, default: 2^20)
+        stream: independent stream of pseudo-casual numbers (optional, default: None, fresh entropy)
+
+    Returns:
+        The defined integral and the uncertainty of the value obtained
+    """
+
+    return _parallel_partial(crude_mc_partial, (function, xmin, xmax), n_evt, workers, chunk_size, stream).result()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+# nodes and weights of the 15-point Kronrod rule and of the embedded 7-point Gauss rule on [-1, 1]
+_KRONROD_POSITIVE_NODES = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                                    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                                    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                                    0.207784955007898467600689403773245])
+_KRONROD_POSITIVE_WEIGHTS = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                                      0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                                      0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                                      0.204432940075298892414161999234649])
+_KRONROD_NODES = np.concatenate((-_KRONROD_POSITIVE_NODES, [0.], _KRONROD_POSITIVE_NODES[::-1]))
+_KRONROD_WEIGHTS = np.concatenate((_KRONROD_POSITIVE_WEIGHTS, [0.209482141084727828012999174891714],
+                                   _KRONROD_POSITIVE_WEIGHTS[::-1]))
+_GAUSS_WEIGHTS = np.zeros(15)
+_GAUSS_WEIGHTS[[1, 3, 5, 7, 9, 11, 13]] = [0.129484966168869693270611432679082,
+                                           0.279705391489276667901467771423780,
+                                           0.381830050505118944950369775488975,
+                                           0.417959183673469387755102040816327,
+                                           0.381830050505118944950369775488975,
+                                           0.279705391489276667901467771423780,
+                                           0.129484966168869693270611432679082]
+
+
+def gauss_kronrod(function,
+                  xmin: float,
+                  xmax: float,
+                  parameters: tuple = (),
+                  abs_tol: float = 1e-10,
+                  rel_tol: float = 1e-8,
+                  max_intervals: int = 1000) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function with the adaptive Gauss-Kronrod quadrature (7-point Gauss
+    and 15-point Kronrod rules). At every step the function is evaluated once on the nodes of all the intervals
+    which have not converged yet, and the intervals whose error estimate |Kronrod - Gauss| is larger than their
+    share of the tolerance, proportional to their length, are bisected. The result is deterministic
+
+    Args:
+        function: function whose integral has to be calculated [must be expressed in the form
+            function(x, *parameters) and accept a numpy array of x, returning an array of the same shape]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        parameters: other arguments of the function (optional, default: ())
+        abs_tol: target absolute error (optional, default: 1e-10)
+        rel_tol: target error relative to the integral (optional, default: 1e-8)
+        max_intervals: maximum number of intervals evaluated at the same step (optional, default: 1000)
+
+    Returns:
+        The defined integral and the estimate of its error
+    """
+
+    length = xmax - xmin
+    lower = np.array([float(xmin)])
+    upper = np.array([float(xmax)])
+    integral = 0.
+    error = 0.
+    while lower.size > 0:
+        centre = 0.5 * (lower + upper)
+        half = 0.5 * (upper - lower)
+        x = centre[:, np.newaxis] + half[:, np.newaxis] * _KRONROD_NODES
+        values = np.broadcast_to(np.asarray(function(x, *parameters), dtype=float), x.shape)
+        kronrod = half * (values @ _KRONROD_WEIGHTS)
+        local_error = np.abs(kronrod - half * (values @ _GAUSS_WEIGHTS))
+
+        tolerance = max(abs_tol, rel_tol * abs(integral + kronrod.sum()))
+        done = local_error <= tolerance * (upper - lower) / length
+        if 2 * np.count_nonzero(~done) > max_intervals:
+            done[:] = True
+        integral += float(kronrod[done].sum())
+        error += float(local_error[done].sum())
+        lower, centre, upper = lower[~done], centre[~done], upper[~done]
+        lower, upper = np.concatenate((lower, centre)), np.concatenate((centre, upper))
+    return integral, error
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+# maximum number of integrals kept in memory by cached_gauss_kronrod, the least recently used are discarded
+_QUADRATURE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_QUADRATURE_CACHE_SIZE)
+def _cached_gauss_kronrod(function,
+                          xmin: float,
+                          xmax: float,
+                          parameters: tuple,
+                          abs_tol: float,
+                          rel_tol: float,
+                          max_intervals: int) -> tuple[float, float]:
+    """
+    Calculation of a defined integral with gauss_kronrod, memoized on all the arguments
+
+    Args:
+        function: function whose integral has to be calculated
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        parameters: tuple of the other arguments of the function
+        abs_tol: target absolute error
+        rel_tol: target error relative to the integral
+        max_intervals: maximum number of intervals evaluated at the same step
+
+    Returns:
+        The defined integral and the estimate of its error
+    """
+
+    return gauss_kronrod(function, xmin, xmax, parameters, abs_tol, rel_tol, max_intervals)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def cached_gauss_kronrod(function,
+                         xmin: float,
+                         xmax: float,
+                         parameters: tuple = (),
+                         abs_tol: float = 1e-10,
+                         rel_tol: float = 1e-8,
+                         max_intervals: int = 1000) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function with gauss_kronrod, reusing the results already computed
+    for the same function, limits and parameters, e.g. the normalization of a pdf computed again and again
+    during a fit. The least recently used results are discarded when more than 4096 are stored
+
+    Args:
+        function: function whose integral has to be calculated [must be expressed in the form
+            function(x, *parameters) and accept a numpy array of x, returning an array of the same shape]
+        xmin: lower limit of the integral
+        xmax: upper limit of the integral
+        parameters: other arguments of the function, which must be hashable (optional, default: ())
+        abs_tol: target absolute error (optional, default: 1e-10)
+        rel_tol: target error relative to the integral (optional, default: 1e-8)
+        max_intervals: maximum number of intervals evaluated at the same step (optional, default: 1000)
+
+    Returns:
+        The defined integral and the estimate of its error
+    """
+
+    return _cached_gauss_kronrod(function, float(xmin), float(xmax), tuple(parameters),
+                                 abs_tol, rel_tol, max_intervals)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def clear_quadrature_cache():
+    """
+    Removes from memory the integrals stored by cached_gauss_kronrod
+    """
+
+    _cached_gauss_kronrod.cache_clear()
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _stratified_mc(weighted_values,
+                   lower: np.ndarray,
+                   upper: np.ndarray,
+                   n_evt: int,
+                   strata: int | list[int],
+                   block_size: int,
+                   generator: np.random.Generator) -> tuple[float, float]:
+    """
+    Monte-carlo estimate of an integral over a box, divided into a grid of cells with the same number of points
+    in each cell (the remainder of the division of n_evt by the number of cells is given to the first cells,
+    one point each). The sums of each cell are accumulated over blocks of points, so that the memory used
+    depends only on block_size and on the number of cells
+
+    Args:
+        weighted_values: function of an (n, d) array of points and of a numpy generator, returning the array
+            of the estimates of the integral over the whole box given by each point
+        lower: lower limits of the box
+        upper: upper limits of the box
+        n_evt: total number of points, at least two for each cell
+        strata: number of cells for each dimension, a single number or one for each dimension
+        block_size: number of points evaluated at once
+        generator: numpy random generator
+
+    Returns:
+        The defined integral and the uncertainty of the value obtained
+    """
+
+    dimension = lower.size
+    strata = np.broadcast_to(np.asarray(strata, dtype=np.int64), (dimension,))
+    n_cells = int(np.prod(strata))
+    if n_evt < 2 * n_cells:
+        raise ValueError(f'n_evt must be at least twice the number of cells ({n_cells})')
+    counts = np.full(n_cells, n_evt // n_cells)
+    counts[:n_evt % n_cells] += 1
+    bounds = np.cumsum(counts)
+    widths = (upper - lower) / strata
+
+    summ = np.zeros(n_cells)
+    squared_summ = np.zeros(n_cells)
+    for start in range(0, n_evt, block_size):
+        cells = np.searchsorted(bounds, np.arange(start, min(start + block_size, n_evt)), side='right')
+        corners = lower + np.stack(np.unravel_index(cells, tuple(strata)), axis=1) * widths
+        values = weighted_values(corners + generator.random((cells.size, dimension)) * widths, generator)
+        summ += np.bincount(cells, weights=values, minlength=n_cells)
+        squared_summ += np.bincount(cells, weights=values * values, minlength=n_cells)
+
+    mean = summ / counts
+    variance = np.maximum(squared_summ - summ * mean, 0.) / (counts - 1)
+    return float(np.sum(mean)) / n_cells, sqrt(float(np.sum(variance / counts))) / n_cells
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def crude_mc_nd(function,
+                xmin: list[float],
+                xmax: list[float],
+                n_evt: int = 100000,
+                region=None,
+                strata: int | list[int] = 1,
+                block_size: int = _BLOCK_SIZE,
+                seed: float = 0.,
+                stream: Stream = None) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function of d variables using the crude monte-carlo method,
+    over a hyper-rectangle or over a region inside it defined by an indicator function. With strata, the
+    hyper-rectangle is divided into a grid of cells with the same number of points (stratified sampling),
+    which reduces the uncertainty when the function changes slowly within each cell
+
+    Args:
+        function: function whose integral has to be calculated
+            [must accept an (n, d) array of points, or an (n,) array if the limits are numbers,
+            returning an array of n values]
+        xmin: lower limits of the hyper-rectangle for each variable
+        xmax: upper limits of the hyper-rectangle for each variable
+        n_evt: number of points generated to calculate the integral, at least two for each cell of the strata
+            (optional, default: 100000)
+        region: indicator function of the region of integration, inside the hyper-rectangle
+            [must accept the same array of points as function, returning an array of n booleans]
+            (optional, default: None, the whole hyper-rectangle)
+        strata: number of cells for each variable, a single number or one for each variable
+            (optional, default: 1, no stratification)
+        block_size: number of points evaluated at once (optional, default: 2^20)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The defined integral and the uncertainty of the value obtained
+    """
+
+    lower, upper, scalar = _limits(xmin, xmax)
+    volume = float(np.prod(upper - lower))
+
+    def weighted_values(points, generator):
+        x = points[:, 0] if scalar else points
+        values = volume * _evaluate(function, x)
+        if region is not None:
+            values = np.where(np.broadcast_to(region(x), values.shape), values, 0.)
+        return values
+
+    return _stratified_mc(weighted_values, lower, upper, n_evt, strata, block_size, _generator(seed, stream))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def hom_nd(function,
+           xmin: list[float],
+           xmax: list[float],
+           ymax: float,
+           n_evt: int = 100000,
+           region=None,
+           strata: int | list[int] = 1,
+           block_size: int = _BLOCK_SIZE,
+           seed: float = 0.,
+           stream: Stream = None) -> tuple[float, float]:
+    """
+    Calculation of a defined integral of a function of d variables using the hit-or-miss method,
+    over a hyper-rectangle or over a region inside it defined by an indicator function, with optional
+    stratification of the hyper-rectangle as in crude_mc_nd
+
+    Args:
+        function: function whose integral has to be calculated
+            [must accept an (n, d) array of points, or an (n,) array if the limits are numbers,
+            returning an array of n values]
+        xmin: lower limits of the hyper-rectangle for each variable
+        xmax: upper limits of the hyper-rectangle for each variable
+        ymax: maximum value of the function in the hyper-rectangle
+        n_evt: number of points generated to calculate the integral, at least two for each cell of the strata
+            (optional, default: 100000)
+        region: indicator function of the region of integration, inside the hyper-rectangle
+            [must accept the same array of points as function, returning an array of n booleans]
+            (optional, default: None, the whole hyper-rectangle)
+        strata: number of cells for each variable, a single number or one for each variable
+            (optional, default: 1, no stratification)
+        block_size: number of points evaluated at once (optional, default: 2^20)
+        seed: starting seed for the random generation (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+    Returns:
+        The defined integral and the uncertainty of the value obtained
+    """
+
+    lower, upper, scalar = _limits(xmin, xmax)
+    volume = float(np.prod(upper - lower)) * ymax
+
+    def weighted_values(points, generator):
+        x = points[:, 0] if scalar else points
+        under = _evaluate(function, x) > generator.random(points.shape[0]) * ymax
+        if region is not None:
+            under &= np.broadcast_to(np.asarray(region(x), dtype=bool), under.shape)
+        return volume * under
+
+    return _stratified_mc(weighted_values, lower, upper, n_evt, strata, block_size, _generator(seed, stream))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
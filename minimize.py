@@ -1,6 +1,16 @@
-import spl.Examples.ex1
-import spl.Examples.ex2
-import spl.Examples.ex3
+import numpy as np
+from math import sqrt
+
+
+# inverse of the golden ratio, (sqrt(5) - 1) / 2
+_GOLDEN_RATIO = (sqrt(5.) - 1.) / 2.
+
+# relative precision of the zeros found with the method of Brent, a few machine epsilons
+_BRENT_ROOT_RELATIVE = 4. * np.finfo(float).eps
+
+# relative precision of the minima found with the method of Brent, square root of the machine epsilon
+# (the function is flat near a minimum, so its values do not locate the minimum better than this)
+_BRENT_MINIMUM_RELATIVE = sqrt(np.finfo(float).eps)
 
 
 def bisection(function,
@@ -21,10 +31,13 @@ def bisection(function,
     """
 
     x_ave = x_min
+    f_min = function(x_min)
     while (x_max - x_min) > precision:
         x_ave = 0.5 * (x_max + x_min)
-        if function(x_ave) * function(x_min) > 0.:
+        f_ave = function(x_ave)
+        if f_ave * f_min > 0.:
             x_min = x_ave
+            f_min = f_ave
         else:
             x_max = x_ave
     return x_ave
@@ -54,7 +67,7 @@ def golden_ratio(function,
         The minimum or maximum of the function
     """
 
-    ratio = 0.618
+    ratio = _GOLDEN_RATIO
     x1 = x_max - (x_max - x_min) * ratio
     x2 = x_min + (x_max - x_min) * ratio
 
@@ -81,6 +94,379 @@ def golden_ratio(function,
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
+def brent_root(function,
+               x_min: float,
+               x_max: float,
+               precision: float = 1e-10,
+               max_iter: int = 100) -> float:
+    """
+    Brent method for finding zeros of a function: the zero is bracketed as in the bisection method, but the steps
+    are taken with the secant method or with the inverse quadratic interpolation of the last three points when they
+    fall well inside the bracket, so that the convergence is superlinear. Every point is evaluated once.
+    The function must have opposite sign in x_min and x_max
+
+    Args:
+        function: function to be studied [must be expressed in the form function(x)]
+        x_min: lower limit of the interval of search
+        x_max: upper limit of the interval of search
+        precision: precision with which the zero is found (optional, default: 1e-10)
+        max_iter: maximum number of evaluations of the function (optional, default: 100)
+
+    Returns:
+        The zero value of a function up to the precision
+    """
+
+    x_pre, x_cur = x_min, x_max
+    f_pre, f_cur = function(x_pre), function(x_cur)
+    if f_pre == 0.:
+        return x_pre
+    if f_cur == 0.:
+        return x_cur
+    if f_pre * f_cur > 0.:
+        raise ValueError('the function must have opposite sign in x_min and x_max')
+
+    x_blk, f_blk, s_pre, s_cur = 0., 0., 0., 0.
+    for iteration in range(max_iter):
+        if f_pre != 0. and f_cur != 0. and (f_pre < 0.) != (f_cur < 0.):
+            x_blk, f_blk = x_pre, f_pre
+            s_pre = s_cur = x_cur - x_pre
+        if abs(f_blk) < abs(f_cur):
+            x_pre, x_cur, x_blk = x_cur, x_blk, x_cur
+            f_pre, f_cur, f_blk = f_cur, f_blk, f_cur
+
+        delta = 0.5 * (precision + _BRENT_ROOT_RELATIVE * abs(x_cur))
+        s_bis = 0.5 * (x_blk - x_cur)
+        if f_cur == 0. or abs(s_bis) < delta:
+            return x_cur
+
+        if abs(s_pre) > delta and abs(f_cur) < abs(f_pre):
+            if x_pre == x_blk:
+                s_try = -f_cur * (x_cur - x_pre) / (f_cur - f_pre)
+            else:
+                d_pre = (f_pre - f_cur) / (x_pre - x_cur)
+                d_blk = (f_blk - f_cur) / (x_blk - x_cur)
+                s_try = -f_cur * (f_blk * d_blk - f_pre * d_pre) / (d_blk * d_pre * (f_blk - f_pre))
+            if 2. * abs(s_try) < min(abs(s_pre), 3. * abs(s_bis) - delta):
+                s_pre, s_cur = s_cur, s_try
+            else:
+                s_pre = s_cur = s_bis
+        else:
+            s_pre = s_cur = s_bis
+
+        x_pre, f_pre = x_cur, f_cur
+        if abs(s_cur) > delta:
+            x_cur += s_cur
+        else:
+            x_cur += delta if s_bis > 0. else -delta
+        f_cur = function(x_cur)
+
+    return x_cur
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _batch_values(function,
+                  x: np.ndarray,
+                  parameters: list[np.ndarray],
+                  index: np.ndarray) -> np.ndarray:
+    """
+    Evaluation of the function of a batch of problems only for the problems in index
+
+    Args:
+        function: function of the problems [in the form function(x, *parameters)]
+        x: array of the points of all the problems
+        parameters: arrays of the parameters of all the problems
+        index: indices of the problems to evaluate
+
+    Returns:
+        The array of the values of the function for the problems in index
+    """
+
+    return np.asarray(function(x[index], *[parameter[index] for parameter in parameters]), dtype=float)
+
+
+def _batch_problems(x_min: float | np.ndarray,
+                    x_max: float | np.ndarray,
+                    parameters: tuple) -> tuple[np.ndarray, np.ndarray, list[np.ndarray], tuple]:
+    """
+    Flattening of the limits and of the parameters of a batch of problems, broadcast to a common shape
+
+    Args:
+        x_min: lower limits of the intervals of search
+        x_max: upper limits of the intervals of search
+        parameters: parameters of the problems, each one a float or an array
+
+    Returns:
+        The flat arrays of the lower and upper limits, the list of the flat arrays of the parameters
+        and the shape of the batch
+    """
+
+    arrays = np.broadcast_arrays(np.asarray(x_min, dtype=float), np.asarray(x_max, dtype=float),
+                                 *[np.asarray(parameter) for parameter in parameters])
+    shape = arrays[0].shape
+    return arrays[0].ravel().copy(), arrays[1].ravel().copy(), [array.ravel() for array in arrays[2:]], shape
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def brent_root_batch(function,
+                     x_min: float | np.ndarray,
+                     x_max: float | np.ndarray,
+                     parameters: tuple = (),
+                     precision: float = 1e-10,
+                     max_iter: int = 100) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Brent method for finding the zeros of many independent functions at once, e.g. one per event or per bin.
+    The steps of brent_root are computed on whole arrays, and at each iteration the function is evaluated only
+    for the problems which have not converged yet, selected by a mask
+
+    Args:
+        function: function to be studied [must be expressed in the form function(x, *parameters) and accept
+            numpy arrays of the points and of the parameters of some of the problems, returning an array]
+        x_min: lower limit or array of lower limits of the intervals of search
+        x_max: upper limit or array of upper limits of the intervals of search
+        parameters: parameters of the problems, each one a float or an array broadcast with the limits
+            (optional, default: ())
+        precision: precision with which the zeros are found (optional, default: 1e-10)
+        max_iter: maximum number of iterations (optional, default: 100)
+
+    Returns:
+        The array of the zeros (nan where the function has the same sign in x_min and x_max) and the boolean
+        array which is true for the problems which converged within max_iter iterations
+    """
+
+    x_pre, x_cur, parameters, shape = _batch_problems(x_min, x_max, parameters)
+    every = np.arange(x_pre.size)
+    f_pre = _batch_values(function, x_pre, parameters, every)
+    f_cur = _batch_values(function, x_cur, parameters, every)
+    x_cur = np.where(f_pre == 0., x_pre, x_cur)
+    f_cur = np.where(f_pre == 0., 0., f_cur)
+    converged = f_cur == 0.
+    invalid = ~converged & (np.signbit(f_pre) == np.signbit(f_cur))
+    active = ~converged & ~invalid
+
+    x_blk, f_blk = np.zeros_like(x_cur), np.zeros_like(x_cur)
+    s_pre, s_cur = np.zeros_like(x_cur), np.zeros_like(x_cur)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for iteration in range(max_iter):
+            bracket = active & (f_pre != 0.) & (f_cur != 0.) & (np.signbit(f_pre) != np.signbit(f_cur))
+            x_blk, f_blk = np.where(bracket, x_pre, x_blk), np.where(bracket, f_pre, f_blk)
+            s_pre = np.where(bracket, x_cur - x_pre, s_pre)
+            s_cur = np.where(bracket, x_cur - x_pre, s_cur)
+            swap = active & (np.abs(f_blk) < np.abs(f_cur))
+            x_pre, x_cur, x_blk = np.where(swap, x_cur, x_pre), np.where(swap, x_blk, x_cur), \
+                np.where(swap, x_cur, x_blk)
+            f_pre, f_cur, f_blk = np.where(swap, f_cur, f_pre), np.where(swap, f_blk, f_cur), \
+                np.where(swap, f_cur, f_blk)
+
+            delta = 0.5 * (precision + _BRENT_ROOT_RELATIVE * np.abs(x_cur))
+            s_bis = 0.5 * (x_blk - x_cur)
+            done = active & ((f_cur == 0.) | (np.abs(s_bis) < delta))
+            converged |= done
+            active &= ~done
+            if not active.any():
+                break
+
+            secant = -f_cur * (x_cur - x_pre) / (f_cur - f_pre)
+            d_pre = (f_pre - f_cur) / (x_pre - x_cur)
+            d_blk = (f_blk - f_cur) / (x_blk - x_cur)
+            quadratic = -f_cur * (f_blk * d_blk - f_pre * d_pre) / (d_blk * d_pre * (f_blk - f_pre))
+            s_try = np.where(x_pre == x_blk, secant, quadratic)
+            accept = (np.abs(s_pre) > delta) & (np.abs(f_cur) < np.abs(f_pre)) & \
+                (2. * np.abs(s_try) < np.minimum(np.abs(s_pre), 3. * np.abs(s_bis) - delta))
+            s_pre = np.where(active, np.where(accept, s_cur, s_bis), s_pre)
+            s_cur = np.where(active, np.where(accept, s_try, s_bis), s_cur)
+
+            x_pre, f_pre = np.where(active, x_cur, x_pre), np.where(active, f_cur, f_pre)
+            step = np.where(np.abs(s_cur) > delta, s_cur, np.where(s_bis > 0., delta, -delta))
+            x_cur = np.where(active, x_cur + step, x_cur)
+            index = np.flatnonzero(active)
+            f_cur[index] = _batch_values(function, x_cur, parameters, index)
+
+    x_cur[invalid] = np.nan
+    return x_cur.reshape(shape), converged.reshape(shape)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def brent_minimum(function,
+                  x_min: float,
+                  x_max: float,
+                  precision: float = 1e-8,
+                  minimum: bool = True,
+                  max_iter: int = 500) -> float:
+    """
+    Brent method for finding minimum or maximum of a function in the interval [x_min, x_max]: the steps of the
+    golden ratio method are replaced by the minimum of the parabola through the last three points when it falls
+    inside the interval and the steps shrink, so that the convergence is superlinear near a smooth extremum.
+    Every point is evaluated once
+
+    Args:
+        function: function to be studied [must be expressed in the form function(x)]
+        x_min: lower limit of the interval of search
+        x_max: upper limit of the interval of search
+        precision: precision with which the maximum or minimum is found (optional, default: 1e-8)
+        minimum: if True, the function calculates the minimum; if False, the function calculates the maximum
+            (optional, default: True)
+        max_iter: maximum number of evaluations of the function (optional, default: 500)
+
+    Returns:
+        The minimum or maximum of the function
+    """
+
+    sign = 1. if minimum else -1.
+    ratio = 1. - _GOLDEN_RATIO
+    a, b = x_min, x_max
+    x = w = v = a + ratio * (b - a)
+    f_x = f_w = f_v = sign * function(x)
+    d = e = 0.
+
+    for iteration in range(max_iter):
+        middle = 0.5 * (a + b)
+        tolerance = _BRENT_MINIMUM_RELATIVE * abs(x) + precision / 3.
+        if abs(x - middle) <= 2. * tolerance - 0.5 * (b - a):
+            break
+
+        parabola = False
+        if abs(e) > tolerance:
+            r = (x - w) * (f_x - f_v)
+            q = (x - v) * (f_x - f_w)
+            p = (x - v) * q - (x - w) * r
+            q = 2. * (q - r)
+            if q > 0.:
+                p = -p
+            else:
+                q = -q
+            r, e = e, d
+            parabola = abs(p) < abs(0.5 * q * r) and q * (a - x) < p < q * (b - x)
+        if parabola:
+            d = p / q
+            u = x + d
+            if u - a < 2. * tolerance or b - u < 2. * tolerance:
+                d = tolerance if x < middle else -tolerance
+        else:
+            e = (b if x < middle else a) - x
+            d = ratio * e
+
+        u = x + (d if abs(d) >= tolerance else (tolerance if d > 0. else -tolerance))
+        f_u = sign * function(u)
+        if f_u <= f_x:
+            if u < x:
+                b = x
+            else:
+                a = x
+            v, f_v, w, f_w, x, f_x = w, f_w, x, f_x, u, f_u
+        else:
+            if u < x:
+                a = u
+            else:
+                b = u
+            if f_u <= f_w or w == x:
+                v, f_v, w, f_w = w, f_w, u, f_u
+            elif f_u <= f_v or v == x or v == w:
+                v, f_v = u, f_u
+
+    return x
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def brent_minimum_batch(function,
+                        x_min: float | np.ndarray,
+                        x_max: float | np.ndarray,
+                        parameters: tuple = (),
+                        precision: float = 1e-8,
+                        minimum: bool = True,
+                        max_iter: int = 500) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Brent method for finding the minima or maxima of many independent functions at once, e.g. one per event or
+    per bin. The steps of brent_minimum are computed on whole arrays, and at each iteration the function is
+    evaluated only for the problems which have not converged yet, selected by a mask
+
+    Args:
+        function: function to be studied [must be expressed in the form function(x, *parameters) and accept
+            numpy arrays of the points and of the parameters of some of the problems, returning an array]
+        x_min: lower limit or array of lower limits of the intervals of search
+        x_max: upper limit or array of upper limits of the intervals of search
+        parameters: parameters of the problems, each one a float or an array broadcast with the limits
+            (optional, default: ())
+        precision: precision with which the maxima or minima are found (optional, default: 1e-8)
+        minimum: if True, the function calculates the minima; if False, the function calculates the maxima
+            (optional, default: True)
+        max_iter: maximum number of iterations (optional, default: 500)
+
+    Returns:
+        The array of the minima or maxima and the boolean array which is true for the problems which
+        converged within max_iter iterations
+    """
+
+    sign = 1. if minimum else -1.
+    ratio = 1. - _GOLDEN_RATIO
+    a, b, parameters, shape = _batch_problems(x_min, x_max, parameters)
+    x = a + ratio * (b - a)
+    w, v = x.copy(), x.copy()
+    f_x = sign * _batch_values(function, x, parameters, np.arange(x.size))
+    f_w, f_v = f_x.copy(), f_x.copy()
+    d, e = np.zeros_like(x), np.zeros_like(x)
+    converged = np.zeros(x.shape, dtype=bool)
+    active = np.ones(x.shape, dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for iteration in range(max_iter):
+            middle = 0.5 * (a + b)
+            tolerance = _BRENT_MINIMUM_RELATIVE * np.abs(x) + precision / 3.
+            done = active & (np.abs(x - middle) <= 2. * tolerance - 0.5 * (b - a))
+            converged |= done
+            active &= ~done
+            if not active.any():
+                break
+
+            candidate = np.abs(e) > tolerance
+            r = (x - w) * (f_x - f_v)
+            q = (x - v) * (f_x - f_w)
+            p = (x - v) * q - (x - w) * r
+            q = 2. * (q - r)
+            p = np.where(candidate, np.where(q > 0., -p, p), 0.)
+            q = np.where(candidate, np.abs(q), 0.)
+            r = np.where(candidate, e, 0.)
+            e = np.where(active & candidate, d, e)
+            parabola = (np.abs(p) < np.abs(0.5 * q * r)) & (p > q * (a - x)) & (p < q * (b - x))
+
+            step = p / q
+            u = x + step
+            step = np.where((u - a < 2. * tolerance) | (b - u < 2. * tolerance),
+                            np.where(x < middle, tolerance, -tolerance), step)
+            golden = np.where(x < middle, b, a) - x
+            d = np.where(active, np.where(parabola, step, ratio * golden), d)
+            e = np.where(active & ~parabola, golden, e)
+
+            u = x + np.where(np.abs(d) >= tolerance, d, np.where(d > 0., tolerance, -tolerance))
+            index = np.flatnonzero(active)
+            f_u = f_x.copy()
+            f_u[index] = sign * _batch_values(function, u, parameters, index)
+
+            better = active & (f_u <= f_x)
+            worse = active & ~better
+            left = u < x
+            a, b = np.where(better, np.where(left, a, x), np.where(worse & left, u, a)), \
+                np.where(better, np.where(left, x, b), np.where(worse & ~left, u, b))
+            shift_w = worse & ((f_u <= f_w) | (w == x))
+            shift_v = worse & ~shift_w & ((f_u <= f_v) | (v == x) | (v == w))
+            v, f_v = np.where(better | shift_w, w, np.where(shift_v, u, v)), \
+                np.where(better | shift_w, f_w, np.where(shift_v, f_u, f_v))
+            w, f_w = np.where(better, x, np.where(shift_w, u, w)), np.where(better, f_x, np.where(shift_w, f_u, f_w))
+            x, f_x = np.where(better, u, x), np.where(better, f_u, f_x)
+
+    return x.reshape(shape), converged.reshape(shape)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
 def minuit_ls_example():
     """
     Example of minimization with the least squares technique in minuit
@@ -89,6 +475,8 @@ def minuit_ls_example():
         Example exercise
     """
 
+    # the examples load iminuit, scipy, matplotlib and IPython, so they are imported only when they are run
+    import spl.Examples.ex1
     spl.Examples.ex1.main()
     return
 
@@ -104,6 +492,7 @@ def minuit_binned_example():
         Example exercise
     """
 
+    import spl.Examples.ex2
     spl.Examples.ex2.main()
     return
 
@@ -119,6 +508,7 @@ def minuit_unbinned_example():
         Example exercise
     """
 
+    import spl.Examples.ex3
     spl.Examples.ex3.main()
     return
 
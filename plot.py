@@ -1,36 +1,101 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import math
+from spl.stat import Sample, Histogram
 
 
-def histogram(sample: list[float],
+def _pyplot():
+    """
+    Returns matplotlib.pyplot, imported when the first plot is drawn so that importing the module
+    does not load matplotlib
+
+    Returns:
+        The module matplotlib.pyplot
+    """
+
+    import matplotlib.pyplot
+    return matplotlib.pyplot
+
+
+def __getattr__(name: str):
+    """
+    Gives access to the attribute plt of the module, matplotlib.pyplot, imported on first access
+
+    Args:
+        name: name of the attribute
+
+    Returns:
+        The module matplotlib.pyplot
+    """
+
+    if name == 'plt':
+        return _pyplot()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def histogram(sample: list[float] | Sample | Histogram,
               title: str = 'Histogram',
               xlabel: str = 'x-axis',
               ylabel: str = 'y-axis',
               label: str = 'Histogram',
-              sturges: bool = True):
+              sturges: bool = True,
+              overlay=None,
+              overlay_label: str = 'Density'):
     """
     Plots a histogram of samples, with optional title and x-label and y-label and legend. The function
     saves the histogram as a png image
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats, Sample or Histogram representing data [the bins of a Histogram are drawn
+            without their empty bins at the sides or, if sturges is true, regrouped by their centers]
         title: title of the histogram
         xlabel: label of the x-axis
         ylabel: label of the y-axis
         label: title of the histogram in the legend
         sturges: if it is true, bins in the histogram are divided accordingly to the sturges rule
+        overlay: pdf drawn over the histogram, scaled to the number of data and to the width of the bins,
+            e.g. a stat.KDE of the sample (optional, default: None)
+            [must be expressed in the form function(x) and accept a numpy array, returning an array]
+        overlay_label: title of the overlay in the legend (optional, default: 'Density')
 
     Returns:
         The plot of the histogram of the sample
     """
 
+    weights = None
+    if isinstance(sample, Histogram):
+        counts, edges = sample
+        filled = np.flatnonzero(counts)
+        if filled.size == 0:
+            filled = np.arange(counts.size)
+        counts, edges = counts[filled[0]:filled[-1] + 1], edges[filled[0]:filled[-1] + 2]
+        entries = sample.entries
+        minimum, maximum = edges[0], edges[-1]
+        sample, weights = 0.5 * (edges[1:] + edges[:-1]), counts
+    elif isinstance(sample, Sample):
+        minimum, maximum = sample.min(), sample.max()
+        sample = sample.data
+        entries = len(sample)
+    else:
+        minimum, maximum = min(sample), max(sample)
+        entries = len(sample)
+
+    plt = _pyplot()
     fig, ax = plt.subplots(nrows=1, ncols=1)
-    if sturges is True:
-        ax.hist(sample, label=label, bins=np.linspace(math.floor(min(sample)), math.ceil(max(sample)),
-                                                      math.ceil(1 + 3.322 * np.log(len(sample)))))
+    if weights is not None and sturges is not True:
+        contents, edges, patches = ax.hist(sample, label=label, bins=edges, weights=weights)
+    elif sturges is True:
+        contents, edges, patches = ax.hist(sample, label=label, weights=weights,
+                                           bins=np.linspace(math.floor(minimum), math.ceil(maximum),
+                                                            math.ceil(1 + 3.322 * np.log(entries))))
     else:
-        ax.hist(sample, label=label)
+        contents, edges, patches = ax.hist(sample, label=label)
+    if overlay is not None:
+        xcoord = np.linspace(edges[0], edges[-1], 1000)
+        widths = np.diff(edges)[np.clip(np.searchsorted(edges, xcoord) - 1, 0, len(edges) - 2)]
+        ax.plot(xcoord, np.asarray(overlay(xcoord)) * entries * widths, label=overlay_label)
     ax.set_title(title, size=14)
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
@@ -72,6 +137,7 @@ def scatter(xcoord: list[float],
         The plot of the scatter
     """
 
+    plt = _pyplot()
     fig, ax = plt.subplots(nrows=1, ncols=1)
     ax.errorbar(xcoord, ycoord, xerr=xerror, yerr=yerror, label=label)
     ax.set_title(title, size=14)
@@ -112,6 +178,7 @@ def graph(xmin: float,
         The plot of the function
     """
 
+    plt = _pyplot()
     fig, ax = plt.subplots(nrows=1, ncols=1)
     xcoord = np.linspace(xmin, xmax, 100000)
     ycoord = []
@@ -1,137 +1,593 @@
-from math import sqrt, log, ceil, pow
+import numpy as np
+from math import sqrt, log, ceil
+from spl.generate import Stream, InverseCDF, _generator, _npz_path, _map_chunks
 
 
-def mean(sample: list[float]) -> float:
+# number of values of the pdf evaluated at once by loglikelihood_array
+_CHUNK_SIZE = 1 << 22
+
+
+class Moments:
+    """
+    Accumulator of the count, the mean and the sums of the powers of the deviations from the mean
+    (m2, m3, m4) of a sample, read in a single pass. Each array of data is reduced with numpy and combined
+    with the previous ones with the formulas of P. Pebay (2008), which do not lose precision when the
+    data have large offsets. Accumulators of different parts of a sample, filled by threads, processes or
+    batch jobs, are combined with merge
+
+    Args:
+        sample: list or array of floats representing data (optional, default: None, empty accumulator,
+            whose mean is nan)
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'm3', 'm4')
+
+    def __init__(self,
+                 sample: list[float] | np.ndarray = None):
+        self.count = 0
+        self.mean = float('nan')
+        self.m2 = 0.
+        self.m3 = 0.
+        self.m4 = 0.
+        if sample is not None:
+            self.update(sample)
+
+    def __repr__(self) -> str:
+        return f'Moments(count={self.count}, mean={self.mean!r}, m2={self.m2!r}, m3={self.m3!r}, m4={self.m4!r})'
+
+    def _combine(self,
+                 count: int,
+                 mean: float,
+                 m2: float,
+                 m3: float,
+                 m4: float):
+        """
+        Combination in place with the moments of other data
+
+        Args:
+            count: number of the other data
+            mean: mean of the other data
+            m2: sum of the squared deviations of the other data from their mean
+            m3: sum of the cubed deviations of the other data from their mean
+            m4: sum of the fourth powers of the deviations of the other data from their mean
+        """
+
+        if count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.m3, self.m4 = count, mean, m2, m3, m4
+            return
+        n_a = self.count
+        n = n_a + count
+        delta = mean - self.mean
+        delta_n = delta / n
+        term = delta * delta_n * n_a * count
+        self.m4 += (m4 + term * delta_n * delta_n * (n_a * n_a - n_a * count + count * count)
+                    + 6. * delta_n * delta_n * (n_a * n_a * m2 + count * count * self.m2)
+                    + 4. * delta_n * (n_a * m3 - count * self.m3))
+        self.m3 += m3 + term * delta_n * (n_a - count) + 3. * delta_n * (n_a * m2 - count * self.m2)
+        self.m2 += m2 + term
+        self.mean += delta_n * count
+        self.count = n
+
+    def update(self,
+               values: list[float] | np.ndarray) -> 'Moments':
+        """
+        Adds an array of data to the accumulator
+
+        Args:
+            values: list or array of floats representing data
+
+        Returns:
+            The accumulator itself
+        """
+
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return self
+        mean = float(np.mean(values))
+        deviations = values - mean
+        squared = deviations * deviations
+        self._combine(values.size, mean, float(np.sum(squared)), float(np.dot(squared, deviations)),
+                      float(np.dot(squared, squared)))
+        return self
+
+    @classmethod
+    def along(cls,
+              data: np.ndarray,
+              axis: int = -1) -> 'Moments':
+        """
+        Moments of each slice of an array along an axis, e.g. of each row of a matrix of bootstrap replicas.
+        The mean and the sums of the powers of the deviations are arrays instead of numbers, and all the
+        statistics are computed for each slice
+
+        Args:
+            data: array of floats representing data
+            axis: axis along which the moments are computed (optional, default: -1)
+
+        Returns:
+            The accumulator of the moments of the slices
+        """
+
+        data = np.asarray(data, dtype=float)
+        if data.shape[axis] == 0:
+            raise ValueError('the slices are empty')
+        moments = cls()
+        moments.count = data.shape[axis]
+        mean = np.mean(data, axis=axis, keepdims=True)
+        deviations = data - mean
+        squared = deviations * deviations
+        moments.mean = np.squeeze(mean, axis=axis)
+        moments.m2 = np.sum(squared, axis=axis)
+        moments.m3 = np.sum(squared * deviations, axis=axis)
+        moments.m4 = np.sum(squared * squared, axis=axis)
+        return moments
+
+    def merge(self,
+              other: 'Moments') -> 'Moments':
+        """
+        Combination of two accumulators
+
+        Args:
+            other: accumulator of other data
+
+        Returns:
+            A new accumulator of all the data
+        """
+
+        merged = Moments()
+        merged._combine(self.count, self.mean, self.m2, self.m3, self.m4)
+        merged._combine(other.count, other.mean, other.m2, other.m3, other.m4)
+        return merged
+
+    def variance(self,
+                 bessel: bool = True) -> float:
+        """
+        Calculation of the variance of the data
+
+        Args:
+            bessel: applies the bessel correction (optional, default: True)
+
+        Returns:
+            The variance of the data
+        """
+
+        if self.count == 0:
+            raise ValueError('the variance of no data is not defined')
+        if bessel and self.count == 1:
+            raise ValueError('the variance with the bessel correction needs at least two data')
+        return self.m2 / (self.count - 1 if bessel else self.count)
+
+    def stddev(self,
+               bessel: bool = True) -> float:
+        """
+        Calculation of the standard deviation of the data
+
+        Args:
+            bessel: applies the bessel correction (optional, default: True)
+
+        Returns:
+            The standard deviation of the data
+        """
+
+        return self.variance(bessel) ** 0.5
+
+    def stderr(self,
+               bessel: bool = True) -> float:
+        """
+        Calculation of the standard error (standard deviation of the mean) of the data
+
+        Args:
+            bessel: applies the bessel correction (optional, default: True)
+
+        Returns:
+            The standard error of the data
+        """
+
+        return (self.variance(bessel) / self.count) ** 0.5
+
+    def skewness(self) -> float:
+        """
+        Calculation of the skewness of the data
+
+        Returns:
+            The skewness of the data (gamma1)
+        """
+
+        return self.m3 / (self.count * self.stddev() ** 3)
+
+    def kurtosis(self) -> float:
+        """
+        Calculation of the kurtosis of the data
+
+        Returns:
+            The kurtosis of the data (gamma2)
+        """
+
+        return self.m4 / (self.count * self.variance() ** 2) - 3
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+class Sample:
+    """
+    Sample of data stored in a contiguous float64 array. The statistics derived from the data (moments, minimum,
+    maximum, sorted data, histograms) are computed only when they are requested for the first time and then
+    stored, so that an analysis asking for many statistics reads the data once. The stored statistics are
+    discarded when data are appended. A Sample can be passed to the functions of stat and plot in place of a list
+
+    Args:
+        data: list or array of floats representing data (optional, default: None, empty sample)
+    """
+
+    __slots__ = ('_data', '_size', '_cache')
+
+    def __init__(self,
+                 data: list[float] | np.ndarray = None):
+        self._data = np.array([] if data is None else data, dtype=np.float64).ravel()
+        self._size = self._data.size
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        cast = dtype is not None and np.dtype(dtype) != self._data.dtype
+        if copy is False and cast:
+            raise ValueError('the data cannot be converted to the requested type without a copy')
+        if copy or cast:
+            return self.data.astype(self._data.dtype if dtype is None else dtype)
+        return self.data
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        Read-only view of the data
+        """
+
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def append(self,
+               values: float | list[float] | np.ndarray):
+        """
+        Appends data to the sample, doubling the capacity of the array when it is full,
+        and discards the stored statistics
+
+        Args:
+            values: float, list or array of floats representing data
+        """
+
+        values = np.asarray(values, dtype=np.float64).ravel()
+        size = self._size + values.size
+        if size > self._data.size:
+            data = np.empty(max(size, 2 * self._data.size))
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        self._data[self._size:size] = values
+        self._size = size
+        self._cache.clear()
+
+    def _cached(self,
+                key,
+                compute):
+        """
+        Returns a statistic, computing it only if it is not stored yet
+
+        Args:
+            key: name of the statistic
+            compute: function without arguments which computes the statistic
+
+        Returns:
+            The value of the statistic
+        """
+
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def moments(self) -> Moments:
+        """
+        Moments of the data, read in a single pass
+        """
+
+        return self._cached('moments', lambda: Moments(self.data))
+
+    def mean(self) -> float:
+        """
+        Calculation of the mean of the sample
+
+        Returns:
+            The mean of the sample
+        """
+
+        return self.moments.mean
+
+    def variance(self,
+                 bessel: bool = True) -> float:
+        """
+        Calculation of the variance of the sample
+
+        Args:
+            bessel: applies the bessel correction (optional, default: True)
+
+        Returns:
+            The variance of the sample
+        """
+
+        return self.moments.variance(bessel)
+
+    def stddev(self,
+               bessel: bool = True) -> float:
+        """
+        Calculation of the standard deviation of the sample
+
+        Args:
+            bessel: applies the bessel correction (optional, default: True)
+
+        Returns:
+            The standard deviation of the sample
+        """
+
+        return self.moments.stddev(bessel)
+
+    def stderr(self,
+               bessel: bool = True) -> float:
+        """
+        Calculation of the standard error (standard deviation of the mean) of the sample
+
+        Args:
+            bessel: applies the bessel correction (optional, default: True)
+
+        Returns:
+            The standard error of the sample
+        """
+
+        return self.moments.stderr(bessel)
+
+    def skewness(self) -> float:
+        """
+        Calculation of the skewness of the sample
+
+        Returns:
+            The skewness of the sample (gamma1)
+        """
+
+        return self.moments.skewness()
+
+    def kurtosis(self) -> float:
+        """
+        Calculation of the kurtosis of the sample
+
+        Returns:
+            The kurtosis of the sample (gamma2)
+        """
+
+        return self.moments.kurtosis()
+
+    def min(self) -> float:
+        """
+        Calculation of the minimum of the sample
+
+        Returns:
+            The minimum of the sample
+        """
+
+        return self._cached('min', lambda: float(np.min(self.data)))
+
+    def max(self) -> float:
+        """
+        Calculation of the maximum of the sample
+
+        Returns:
+            The maximum of the sample
+        """
+
+        return self._cached('max', lambda: float(np.max(self.data)))
+
+    def sorted(self) -> np.ndarray:
+        """
+        Returns the data sorted in ascending order
+
+        Returns:
+            A read-only array of the sorted data
+        """
+
+        def compute():
+            ordered = np.sort(self.data)
+            ordered.flags.writeable = False
+            return ordered
+
+        return self._cached('sorted', compute)
+
+    def histogram(self,
+                  bins: int | tuple = None,
+                  range: tuple[float, float] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Calculation of the histogram of the sample
+
+        Args:
+            bins: number of bins, or sequence of the edges of the bins
+                (optional, default: None, number of bins according to the sturges rule)
+            range: lower and upper limits of the bins (optional, default: None, minimum and maximum of the sample)
+
+        Returns:
+            The contents and the edges of the bins, as returned by np.histogram
+        """
+
+        if bins is None:
+            bins = sturges(self)
+        elif np.ndim(bins) > 0:
+            bins = tuple(float(edge) for edge in bins)
+        if range is None:
+            range = (self.min(), self.max())
+        return self._cached(('histogram', bins, range), lambda: np.histogram(self.data, bins, range))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _moments(sample: list[float] | Sample,
+             axis: int = None) -> Moments:
+    """
+    Returns the moments of a sample, stored in the Sample or computed from the list,
+    or the moments of each slice of an array along an axis
+
+    Args:
+        sample: list of floats or Sample representing data
+        axis: axis of the array along which the moments are computed (optional, default: None, whole sample)
+
+    Returns:
+        The moments of the sample
+    """
+
+    if axis is not None:
+        moments = Moments.along(sample, axis)
+    elif isinstance(sample, Sample):
+        moments = sample.moments
+    else:
+        moments = Moments(sample)
+    if moments.count == 0:
+        raise ValueError('the sample is empty')
+    return moments
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def mean(sample: list[float] | Sample,
+         axis: int = None) -> float | np.ndarray:
     """
     Calculation of the mean of the sample present in the object
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats or Sample representing data
+        axis: axis along which the statistic is computed for each slice of an array, as in numpy
+            (optional, default: None, whole sample)
 
     Returns:
         The mean of the sample
     """
 
-    summ = sum(sample)
-    n = len(sample)
-    return summ / n
+    return _moments(sample, axis).mean
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def variance(sample: list[float],
-             bessel: bool = True) -> float:
+def variance(sample: list[float] | Sample,
+             bessel: bool = True,
+             axis: int = None) -> float | np.ndarray:
     """
     Calculation of the variance of the sample present in the object
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats or Sample representing data
         bessel: applies the bessel correction (optional, default: True)
+        axis: axis along which the statistic is computed for each slice of an array, as in numpy
+            (optional, default: None, whole sample)
 
     Returns:
         The variance of the sample
     """
 
-    summ = 0.
-    sum_sq = 0.
-    n = len(sample)
-    for elem in sample:
-        summ += elem
-        sum_sq += elem * elem
-    var = sum_sq / n - summ * summ / (n * n)
-    if bessel:
-        var = n * var / (n - 1)
-    return var
+    return _moments(sample, axis).variance(bessel)
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def stddev(sample: list[float],
-           bessel: bool = True) -> float:
+def stddev(sample: list[float] | Sample,
+           bessel: bool = True,
+           axis: int = None) -> float | np.ndarray:
     """
     Calculation of the standard deviation of the sample present in the object
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats or Sample representing data
         bessel: applies the bessel correction (optional, default: True)
+        axis: axis along which the statistic is computed for each slice of an array, as in numpy
+            (optional, default: None, whole sample)
 
     Returns:
         The standard deviation of the sample
     """
 
-    return sqrt(variance(sample, bessel))
+    return _moments(sample, axis).stddev(bessel)
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def stderr(sample: list[float],
-           bessel: bool = True) -> float:
+def stderr(sample: list[float] | Sample,
+           bessel: bool = True,
+           axis: int = None) -> float | np.ndarray:
     """
     Calculation of the standard error (standard deviation of the mean)
     of the sample present in the object
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats or Sample representing data
         bessel: applies the bessel correction (optional, default: True)
+        axis: axis along which the statistic is computed for each slice of an array, as in numpy
+            (optional, default: None, whole sample)
 
     Returns:
         The standard error of the sample
     """
-    n = len(sample)
-    return sqrt(variance(sample, bessel) / n)
+    return _moments(sample, axis).stderr(bessel)
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def skewness(sample: list[float]) -> float:
+def skewness(sample: list[float] | Sample,
+             axis: int = None) -> float | np.ndarray:
     """
     Calculation of the skewness of the sample passed as argument
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats or Sample representing data
+        axis: axis along which the statistic is computed for each slice of an array, as in numpy
+            (optional, default: None, whole sample)
 
     Returns:
         The skewness of the sample (gamma1)
     """
 
-    mean_sample = mean(sample)
-    skew = 0.
-    for x in sample:
-        skew = skew + pow(x - mean_sample,  3)
-    skew = skew / (len(sample) * pow(stddev(sample), 3))
-    return skew
+    return _moments(sample, axis).skewness()
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def kurtosis(sample: list[float]) -> float:
+def kurtosis(sample: list[float] | Sample,
+             axis: int = None) -> float | np.ndarray:
     """
     Calculation of the kurtosis of the sample passed as argument
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats or Sample representing data
+        axis: axis along which the statistic is computed for each slice of an array, as in numpy
+            (optional, default: None, whole sample)
 
     Returns:
         The kurtosis of the sample (gamma2)
     """
 
-    mean_sample = mean(sample)
-    kurt = 0.
-    for x in sample:
-        kurt = kurt + pow(x - mean_sample,  4)
-    kurt = kurt / (len(sample) * pow(variance(sample), 2)) - 3
-    return kurt
+    return _moments(sample, axis).kurtosis()
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def likelihood(sample: list[float],
+def likelihood(sample: list[float] | Sample,
                parameter: float,
                pdf) -> float:
     """
@@ -140,7 +596,7 @@ def likelihood(sample: list[float],
     according to their pdf with a parameter
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats or Sample representing data
         parameter: the parameter of the probability density function
         pdf: probability density function associated with the sample [must be expressed in the form pdf(x, parameter)]
 
@@ -158,7 +614,7 @@ def likelihood(sample: list[float],
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def loglikelihood(sample: list[float],
+def loglikelihood(sample: list[float] | Sample,
                   parameter: float,
                   pdf) -> float:
     """
@@ -167,7 +623,7 @@ def loglikelihood(sample: list[float],
     according to their pdf with a parameter
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats or Sample representing data
         parameter: the parameter of the probability density function
         pdf: probability density function associated with the sample [must be expressed in the form pdf(x, parameter)]
 
@@ -186,18 +642,1080 @@ def loglikelihood(sample: list[float],
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
 
 
-def sturges(sample: list[float]) -> int:
+def loglikelihood_array(sample: list[float] | np.ndarray | Sample,
+                        parameter: float | np.ndarray,
+                        pdf,
+                        chunk_size: int = _CHUNK_SIZE) -> float | np.ndarray:
+    """
+    Calculation of the log-likelihood function for a sample of independent variables, identically distributed
+    according to their pdf with a parameter, evaluating the pdf on the whole sample at once. The values of the
+    pdf which are not positive are skipped, as in loglikelihood. With an array of parameters, the whole
+    log-likelihood curve is computed in one call, evaluating the pdf on the (sample, parameter) grid in
+    chunks of about chunk_size values to bound the memory
+
+    Args:
+        sample: list, array or Sample of floats representing data
+        parameter: the parameter of the probability density function, or an array of parameters
+        pdf: probability density function associated with the sample [must be expressed in the form
+            pdf(x, parameter) and accept numpy arrays broadcast together, returning an array]
+        chunk_size: number of values of the pdf evaluated at once (optional, default: 2^22)
+
+    Returns:
+        Value of the log-likelihood for the chosen parameter, or array of the values for each parameter
+    """
+
+    x = np.asarray(sample, dtype=float).ravel()
+    parameters = np.asarray(parameter, dtype=float)
+    scalar = parameters.ndim == 0
+    parameters = parameters.ravel()
+    rows = max(1, chunk_size // parameters.size)
+
+    result = np.zeros(parameters.size)
+    for start in range(0, x.size, rows):
+        block = x[start:start + rows, np.newaxis]
+        values = np.broadcast_to(np.asarray(pdf(block, parameters[np.newaxis, :]), dtype=float),
+                                 (block.shape[0], parameters.size))
+        result += np.sum(np.log(np.where(values > 0., values, 1.)), axis=0)
+    return float(result[0]) if scalar else result
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def sturges(sample: list[float] | Sample) -> int:
     """
     Calculation of the optimal number of bins to plot a histogram using the sturges rule
 
     Args:
-        sample: list of floats representing data
+        sample: list of floats, Sample or Histogram representing data
 
     Returns:
         The number of bins according to sturges rule
     """
 
-    return int(ceil(1 + 3.322 * log(len(sample))))
+    size = sample.entries if isinstance(sample, Histogram) else len(sample)
+    return int(ceil(1 + 3.322 * log(size)))
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def quantile(sample: list[float] | np.ndarray | Sample,
+             q: float | np.ndarray) -> float | np.ndarray:
+    """
+    Calculation of the exact quantiles of a sample, interpolating linearly between the sorted data.
+    For a Sample the sorted data are computed once and stored
+
+    Args:
+        sample: list, array or Sample of floats representing data
+        q: probability or array of probabilities between [0, 1]
+
+    Returns:
+        The quantile or the array of quantiles of the sample
+    """
+
+    if isinstance(sample, Sample):
+        ordered = sample.sorted()
+    else:
+        ordered = np.sort(np.asarray(sample, dtype=float).ravel())
+    if ordered.size == 0:
+        raise ValueError('the sample is empty')
+    q = np.asarray(q, dtype=float)
+    if not np.all((q >= 0.) & (q <= 1.)):
+        raise ValueError('the probabilities must be between [0, 1]')
+    position = q * (ordered.size - 1)
+    lower = np.clip(np.floor(position).astype(np.int64), 0, ordered.size - 1)
+    upper = np.minimum(lower + 1, ordered.size - 1)
+    result = ordered[lower] + (position - lower) * (ordered[upper] - ordered[lower])
+    return float(result) if result.ndim == 0 else result
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def median(sample: list[float] | np.ndarray | Sample) -> float:
+    """
+    Calculation of the median of a sample
+
+    Args:
+        sample: list, array or Sample of floats representing data
+
+    Returns:
+        The median of the sample
+    """
+
+    return quantile(sample, 0.5)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of a stream of data with bounded memory (KLL sketch, Karnin, Lang and Liberty 2016).
+    The data are kept in a hierarchy of compactors: when the compactor of level h is full, its data are sorted and
+    one out of two, starting at random from the first or the second, is promoted to the level h + 1 with weight
+    2^(h + 1). The capacity of the levels decreases by 2/3 from the top down to 2, so the sketch holds less than
+    3 k values. With this schedule the error on the rank of the quantiles stays below about 2.5/k of the number of
+    data with high probability (about 1.3% for the default k = 200), independently of the number of data.
+    Sketches of different parts of a stream, filled by threads, processes or batch jobs, are combined with merge
+
+    Args:
+        k: capacity of the top level, which sets the accuracy (optional, default: 200)
+        seed: starting seed for the random compactions (optional)
+        stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+    """
+
+    __slots__ = ('k', 'count', 'minimum', 'maximum', 'levels', 'generator')
+
+    def __init__(self,
+                 k: int = 200,
+                 seed: float = 0.,
+                 stream: Stream = None):
+        self.k = k
+        self.count = 0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self.levels = [np.empty(0)]
+        self.generator = _generator(seed, stream)
+
+    def _capacity(self,
+                  level: int) -> int:
+        """
+        Capacity of a level of the sketch
+
+        Args:
+            level: index of the level, 0 for the bottom
+
+        Returns:
+            The maximum number of values of the level
+        """
+
+        return max(2, int(ceil(self.k * (2. / 3.) ** (len(self.levels) - 1 - level))))
+
+    def _compress(self):
+        """
+        Compaction of the full levels, from the bottom to the top
+        """
+
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                items = np.sort(items)
+                if items.size % 2 == 1:
+                    kept, items = items[:1], items[1:]
+                else:
+                    kept = items[:0]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                promoted = items[int(self.generator.integers(2))::2]
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+                self.levels[level] = kept
+            level += 1
+
+    def update(self,
+               values: float | list[float] | np.ndarray) -> 'QuantileSketch':
+        """
+        Adds an array of data to the sketch
+
+        Args:
+            values: float, list or array of floats representing data
+
+        Returns:
+            The sketch itself
+        """
+
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.minimum = min(self.minimum, float(np.min(values)))
+        self.maximum = max(self.maximum, float(np.max(values)))
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+
+    def merge(self,
+              other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Combination of two sketches
+
+        Args:
+            other: sketch of other data
+
+        Returns:
+            A new sketch of all the data, with the accuracy of the first sketch
+        """
+
+        merged = QuantileSketch(self.k)
+        merged.generator = self.generator
+        merged.count = self.count + other.count
+        merged.minimum = min(self.minimum, other.minimum)
+        merged.maximum = max(self.maximum, other.maximum)
+        merged.levels = [np.empty(0) for level in range(max(len(self.levels), len(other.levels)))]
+        for sketch in (self, other):
+            for level, items in enumerate(sketch.levels):
+                merged.levels[level] = np.concatenate((merged.levels[level], items))
+        merged._compress()
+        return merged
+
+    def quantile(self,
+                 q: float | np.ndarray) -> float | np.ndarray:
+        """
+        Calculation of the approximate quantiles of the data
+
+        Args:
+            q: probability or array of probabilities between [0, 1]
+
+        Returns:
+            The quantile or the array of quantiles of the data
+        """
+
+        if self.count == 0:
+            raise ValueError('the sketch is empty')
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2. ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        q = np.asarray(q, dtype=float)
+        index = np.minimum(np.searchsorted(cumulative, q * cumulative[-1]), items.size - 1)
+        result = np.where(q <= 0., self.minimum, np.where(q >= 1., self.maximum, items[index]))
+        return float(result) if result.ndim == 0 else result
+
+    def median(self) -> float:
+        """
+        Calculation of the approximate median of the data
+
+        Returns:
+            The median of the data
+        """
+
+        return self.quantile(0.5)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+# number of bins of the histograms with automatic range
+_HISTOGRAM_BINS = 1024
+
+# the first range of a histogram with automatic range is at least max(|data|, 1) / 2^20 wide,
+# so that a first chunk with a single value or identical values does not give bins of the size of an ulp
+_HISTOGRAM_MIN_SPAN = 2. ** -20
+
+
+class Histogram:
+    """
+    Histogram filled with chunks of data, so that the data do not need to be held in memory. The bins are either
+    fixed, given by their number and range or by their edges, or have an automatic range: in this case the width of
+    the bins is a power of two and the edges are multiples of the width, and when data fall outside the range the
+    width is doubled, merging the old bins two by two, until they are contained. With fixed bins the data outside
+    the range are counted in the underflow and overflow. Histograms of different parts of the data, filled by
+    processes or batch jobs, are combined exactly with merge or with the + operator. Iterating over a histogram
+    gives the contents and the edges of the bins like np.histogram, e.g. counts, edges = histogram
+
+    Args:
+        bins: number of bins, or sequence of the edges of the bins (optional, default: None, 1024 bins)
+        range: lower and upper limits of the bins (optional, default: None, automatic range)
+    """
+
+    __slots__ = ('_bins', '_minimum', '_width', '_edges', '_auto', '_counts', '_sumw2')
+
+    def __init__(self,
+                 bins: int | list[float] | np.ndarray = None,
+                 range: tuple[float, float] = None):
+        if bins is not None and np.ndim(bins) > 0:
+            self._edges = np.array(bins, dtype=np.float64)
+            if self._edges.size < 2 or np.any(np.diff(self._edges) <= 0.):
+                raise ValueError('the edges of the bins must be at least two and increasing')
+            self._bins = self._edges.size - 1
+            self._minimum, self._width = None, None
+            self._auto = False
+        else:
+            self._bins = _HISTOGRAM_BINS if bins is None else int(bins)
+            if self._bins < 1:
+                raise ValueError('the number of bins must be positive')
+            self._auto = range is None
+            if self._auto:
+                self._minimum, self._width, self._edges = None, None, None
+            else:
+                if not range[0] < range[1]:
+                    raise ValueError('the lower limit of the range must be smaller than the upper limit')
+                self._edges = np.linspace(range[0], range[1], self._bins + 1)
+                self._minimum, self._width = float(range[0]), (range[1] - range[0]) / self._bins
+        self._counts = np.zeros(self._bins + 2)
+        self._sumw2 = None
+
+    def __repr__(self) -> str:
+        return f'Histogram(bins={self._bins}, range={self.range!r}, entries={self.entries!r})'
+
+    def __iter__(self):
+        return iter((self.counts, self.edges))
+
+    @property
+    def bins(self) -> int:
+        """
+        Number of bins
+        """
+
+        return self._bins
+
+    @property
+    def edges(self) -> np.ndarray:
+        """
+        Edges of the bins
+        """
+
+        if self._edges is None:
+            if self._minimum is None:
+                raise ValueError('the range of the histogram is not defined before it is filled')
+            self._edges = self._minimum + self._width * np.arange(self._bins + 1)
+        return self._edges
+
+    @property
+    def range(self) -> tuple[float, float] | None:
+        """
+        Lower and upper limits of the bins, None for an empty histogram with automatic range
+        """
+
+        if self._edges is None and self._minimum is None:
+            return None
+        return float(self.edges[0]), float(self.edges[-1])
+
+    @property
+    def centers(self) -> np.ndarray:
+        """
+        Centers of the bins
+        """
+
+        edges = self.edges
+        return 0.5 * (edges[1:] + edges[:-1])
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        Contents of the bins (sums of the weights)
+        """
+
+        return self._counts[1:-1].copy()
+
+    @property
+    def errors(self) -> np.ndarray:
+        """
+        Statistical errors of the contents of the bins (square roots of the sums of the squared weights)
+        """
+
+        return np.sqrt((self._counts if self._sumw2 is None else self._sumw2)[1:-1])
+
+    @property
+    def underflow(self) -> float:
+        """
+        Content below the range
+        """
+
+        return float(self._counts[0])
+
+    @property
+    def overflow(self) -> float:
+        """
+        Content above the range
+        """
+
+        return float(self._counts[-1])
+
+    @property
+    def entries(self) -> float:
+        """
+        Total content, underflow and overflow included (number of data without weights)
+        """
+
+        return float(np.sum(self._counts))
+
+    def _grid(self,
+              low: float,
+              high: float,
+              width: float) -> tuple[float, float]:
+        """
+        Smallest automatic range containing the interval [low, high], with the width of the bins equal to width
+        multiplied by a power of two
+
+        Args:
+            low: lower limit of the interval
+            high: upper limit of the interval
+            width: starting width of the bins
+
+        Returns:
+            The lower limit and the width of the bins of the range
+        """
+
+        minimum = np.floor(low / width) * width
+        while minimum + self._bins * width < high:
+            width *= 2.
+            minimum = np.floor(low / width) * width
+        return float(minimum), width
+
+    def _regrid(self,
+                minimum: float,
+                width: float):
+        """
+        Moves the contents of the bins of the automatic range to a range with wider bins which contains
+        the bins which are not empty
+
+        Args:
+            minimum: lower limit of the new range
+            width: width of the bins of the new range, the old width multiplied by a power of two
+        """
+
+        if self._minimum is not None and (minimum != self._minimum or width != self._width):
+            # each old bin is contained in a new bin, so its center is far from the new edges: the index is
+            # computed in floating point, without integer ratios which overflow for very different widths
+            centers = self._minimum + (np.arange(self._bins) + 0.5) * self._width
+            index = np.floor((centers - minimum) / width)
+            index = np.clip(index, -1., self._bins).astype(np.int64) + 1
+            inside = (index >= 1) & (index <= self._bins)
+            for name in ('_counts', '_sumw2'):
+                old = getattr(self, name)
+                if old is not None:
+                    new = np.zeros_like(old)
+                    new[0], new[-1] = old[0], old[-1]
+                    new[1:-1] = np.bincount(index[inside], old[1:-1][inside], minlength=self._bins + 2)[1:-1]
+                    setattr(self, name, new)
+        self._minimum, self._width, self._edges = minimum, width, None
+
+    def _occupied(self) -> tuple[float, float]:
+        """
+        Lower and upper limits of the bins of the automatic range between the first and the last bins
+        which are not empty
+
+        Returns:
+            The limits of the occupied bins, or the lower limit of the range twice if all the bins are empty
+        """
+
+        filled = self._counts[1:-1] != 0.
+        if self._sumw2 is not None:
+            filled |= self._sumw2[1:-1] != 0.
+        index = np.flatnonzero(filled)
+        if index.size == 0:
+            return self._minimum, self._minimum
+        return self._minimum + index[0] * self._width, self._minimum + (index[-1] + 1) * self._width
+
+    def _extend(self,
+                low: float,
+                high: float):
+        """
+        Extends the automatic range so that it contains the data between low and high
+
+        Args:
+            low: minimum of the data
+            high: maximum of the data
+        """
+
+        span = max(high - low, max(abs(low), abs(high), 1.) * _HISTOGRAM_MIN_SPAN)
+        high = float(np.nextafter(high, np.inf))
+        if self._minimum is None:
+            self._regrid(*self._grid(low, high, 2. ** ceil(log(span / self._bins, 2))))
+        elif low < self._minimum or high > self._minimum + self._bins * self._width:
+            first, last = self._occupied()
+            self._regrid(*self._grid(min(low, first), max(high, last), self._width))
+
+    def _index(self,
+               values: np.ndarray) -> np.ndarray:
+        """
+        Indices of the bins of the data, 0 for the underflow and bins + 1 for the overflow
+
+        Args:
+            values: array of floats representing data
+
+        Returns:
+            The array of the indices
+        """
+
+        if self._auto and self._minimum is None:
+            # empty automatic range: the data are all not finite
+            return np.where(values < 0., 0, self._bins + 1)
+        if self._width is None:
+            index = np.searchsorted(self._edges, values, side='right')
+            index[values == self._edges[-1]] = self._bins
+            return index
+        position = (values - self._minimum) / self._width
+        np.floor(position, out=position)
+        np.clip(position, -1., self._bins, out=position)
+        np.nan_to_num(position, copy=False, nan=self._bins)
+        index = position.astype(np.int64) + 1
+        if not self._auto:
+            index[values == self._edges[-1]] = self._bins
+        return index
+
+    def fill(self,
+             values: float | list[float] | np.ndarray,
+             weights: float | list[float] | np.ndarray = None) -> 'Histogram':
+        """
+        Adds a chunk of data to the histogram. With fixed bins, the data below the range (-inf included) are counted
+        in the underflow and the data above the range (inf and nan included) in the overflow; with automatic range,
+        only the data which are not finite
+
+        Args:
+            values: float, list or array of floats representing data
+            weights: weight or array of weights of the data (optional, default: None, weight 1)
+
+        Returns:
+            The histogram itself
+        """
+
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return self
+        if self._auto:
+            low, high = float(np.min(values)), float(np.max(values))
+            if not np.isfinite(low) or not np.isfinite(high):
+                finite = values[np.isfinite(values)]
+                low, high = (float(np.min(finite)), float(np.max(finite))) if finite.size else (None, None)
+            if low is not None:
+                self._extend(low, high)
+        index = self._index(values)
+        if weights is None:
+            counts = np.bincount(index, minlength=self._bins + 2)
+            self._counts += counts
+            if self._sumw2 is not None:
+                self._sumw2 += counts
+        else:
+            weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), values.shape).ravel()
+            if self._sumw2 is None:
+                self._sumw2 = self._counts.copy()
+            self._counts += np.bincount(index, weights, minlength=self._bins + 2)
+            self._sumw2 += np.bincount(index, weights * weights, minlength=self._bins + 2)
+        return self
+
+    def fill_chunks(self,
+                    chunks,
+                    weights=None) -> 'Histogram':
+        """
+        Adds to the histogram the chunks of data of an iterable, e.g. the iterator returned by generate.iter_generate
+
+        Args:
+            chunks: iterable over arrays of floats representing data
+            weights: iterable over the arrays of weights of the chunks (optional, default: None, weight 1)
+
+        Returns:
+            The histogram itself
+        """
+
+        if weights is None:
+            for chunk in chunks:
+                self.fill(chunk)
+        else:
+            for chunk, chunk_weights in zip(chunks, weights):
+                self.fill(chunk, chunk_weights)
+        return self
+
+    def _copy(self) -> 'Histogram':
+        """
+        Copy of the histogram
+
+        Returns:
+            A new histogram with the same bins and contents
+        """
+
+        copy = Histogram.__new__(Histogram)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(copy, name, value.copy() if isinstance(value, np.ndarray) else value)
+        return copy
+
+    def merge(self,
+              other: 'Histogram') -> 'Histogram':
+        """
+        Combination of two histograms with the same bins, or with automatic range and the same number of bins
+
+        Args:
+            other: histogram of other data
+
+        Returns:
+            A new histogram of all the data
+        """
+
+        if self._bins != other._bins or self._auto != other._auto:
+            raise ValueError('the histograms have different bins')
+        merged, other = self._copy(), other._copy()
+        if self._auto:
+            if merged._minimum is None:
+                merged._regrid(other._minimum, other._width)
+            elif other._minimum is not None:
+                (first, last), (other_first, other_last) = merged._occupied(), other._occupied()
+                grid = merged._grid(min(first, other_first), max(last, other_last), max(merged._width, other._width))
+                merged._regrid(*grid)
+                other._regrid(*grid)
+        elif not np.array_equal(merged.edges, other.edges):
+            raise ValueError('the histograms have different bins')
+        if merged._sumw2 is not None or other._sumw2 is not None:
+            merged._sumw2 = (merged._counts if merged._sumw2 is None else merged._sumw2) + \
+                            (other._counts if other._sumw2 is None else other._sumw2)
+        merged._counts += other._counts
+        return merged
+
+    __add__ = merge
+
+    def rebin(self,
+              factor: int) -> 'Histogram':
+        """
+        Histogram with the bins merged in groups of factor consecutive bins
+
+        Args:
+            factor: number of bins merged, which must divide the number of bins
+
+        Returns:
+            A new histogram with fixed bins
+        """
+
+        if self._bins % factor != 0:
+            raise ValueError('the factor must divide the number of bins')
+        rebinned = Histogram(self.edges[::factor])
+        for name in ('_counts', '_sumw2'):
+            old = getattr(self, name)
+            if old is not None:
+                new = np.empty(rebinned._bins + 2)
+                new[0], new[-1] = old[0], old[-1]
+                new[1:-1] = old[1:-1].reshape(-1, factor).sum(axis=1)
+                setattr(rebinned, name, new)
+        return rebinned
+
+    def save(self,
+             path: str):
+        """
+        Saves the histogram into a numpy .npz file
+
+        Args:
+            path: path of the file, to which the extension .npz is added if it is missing
+        """
+
+        np.savez(_npz_path(path), bins=self._bins, auto=self._auto,
+                 minimum=np.nan if self._minimum is None else self._minimum,
+                 width=np.nan if self._width is None else self._width,
+                 edges=np.empty(0) if self._edges is None else self._edges,
+                 counts=self._counts, sumw2=np.empty(0) if self._sumw2 is None else self._sumw2)
+
+    @classmethod
+    def load(cls,
+             path: str) -> 'Histogram':
+        """
+        Loads a histogram saved with save
+
+        Args:
+            path: path of the file, to which the extension .npz is added if it is missing
+
+        Returns:
+            The histogram
+        """
+
+        histogram = cls.__new__(cls)
+        with np.load(_npz_path(path)) as data:
+            histogram._bins = int(data['bins'])
+            histogram._auto = bool(data['auto'])
+            histogram._minimum = None if np.isnan(data['minimum']) else float(data['minimum'])
+            histogram._width = None if np.isnan(data['width']) else float(data['width'])
+            histogram._edges = data['edges'] if data['edges'].size else None
+            histogram._counts = data['counts']
+            histogram._sumw2 = data['sumw2'] if data['sumw2'].size else None
+        return histogram
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+# the gaussian kernel of KDE is truncated at this number of bandwidths
+_KDE_KERNEL_CUT = 8.
+
+
+class KDE:
+    """
+    Kernel density estimate of a sample with a gaussian kernel, computed on a grid: the data are binned linearly
+    on the points of the grid (each datum is shared between the two nearest points) and the binned data are
+    convolved with the kernel by FFT, so that the cost is proportional to the number of data plus the number of
+    points of the grid instead of their product. The bandwidth and the estimate are computed only when they are
+    requested for the first time. Between the points of the grid the density is interpolated linearly, so a KDE
+    can be called as a pdf accepting numpy arrays, e.g. by plot.graph or by the generators of generate.
+    A Histogram can be passed in place of the data, with its contents placed at the centers of the bins
+
+    Args:
+        sample: list, array, Sample or Histogram of floats representing data
+        bandwidth: rule of the bandwidth, 'silverman' or 'scott', or value of the bandwidth
+            (optional, default: 'silverman')
+        grid_size: number of points of the grid (optional, default: 4096)
+        cut: distance of the ends of the grid from the minimum and the maximum of the data, in bandwidths
+            (optional, default: 4.)
+    """
+
+    __slots__ = ('_points', '_weights', '_size', '_rule', '_bandwidth', '_grid_size', '_cut', '_grid', '_density')
+
+    def __init__(self,
+                 sample: list[float] | np.ndarray | Sample | Histogram,
+                 bandwidth: str | float = 'silverman',
+                 grid_size: int = 4096,
+                 cut: float = 4.):
+        if isinstance(sample, Histogram):
+            counts = sample.counts
+            filled = counts != 0.
+            self._points, self._weights = sample.centers[filled], counts[filled]
+            self._size = float(np.sum(self._weights))
+        else:
+            self._points, self._weights = np.asarray(sample, dtype=float).ravel(), None
+            self._size = float(self._points.size)
+        if self._size <= 0.:
+            raise ValueError('the sample is empty')
+        if isinstance(bandwidth, str):
+            if bandwidth not in ('silverman', 'scott'):
+                raise ValueError("the bandwidth must be 'silverman', 'scott' or a positive value")
+            self._rule, self._bandwidth = bandwidth, None
+        else:
+            if not bandwidth > 0.:
+                raise ValueError("the bandwidth must be 'silverman', 'scott' or a positive value")
+            self._rule, self._bandwidth = None, float(bandwidth)
+        if grid_size < 2:
+            raise ValueError('the grid must have at least two points')
+        self._grid_size = int(grid_size)
+        self._cut = cut
+        self._grid, self._density = None, None
+
+    def __repr__(self) -> str:
+        return f'KDE(size={self._size!r}, bandwidth={self.bandwidth!r}, grid_size={self._grid_size})'
+
+    @property
+    def bandwidth(self) -> float:
+        """
+        Bandwidth of the kernel: with the rule of Silverman 0.9 min(sigma, IQR / 1.34) n^(-1/5), with the rule of
+        Scott 1.06 sigma n^(-1/5), where sigma is the standard deviation and IQR the interquartile range of the data
+        """
+
+        if self._bandwidth is None:
+            if self._weights is None:
+                sigma = float(np.std(self._points, ddof=1)) if self._points.size > 1 else 0.
+                quartiles = np.quantile(self._points, (0.25, 0.75))
+            else:
+                average = np.average(self._points, weights=self._weights)
+                sigma = sqrt(float(np.average((self._points - average) ** 2, weights=self._weights)))
+                quartiles = np.interp(np.array((0.25, 0.75)) * self._size, np.cumsum(self._weights), self._points)
+            if self._rule == 'silverman':
+                iqr = float(quartiles[1] - quartiles[0]) / 1.34
+                spread = 0.9 * (min(sigma, iqr) if iqr > 0. else sigma)
+            else:
+                spread = 1.06 * sigma
+            if not spread > 0.:
+                spread = abs(float(self._points[0])) * 1e-3 or 1e-3
+            self._bandwidth = spread * self._size ** -0.2
+        return self._bandwidth
+
+    def _evaluate(self):
+        """
+        Calculation of the estimate on the grid, binning linearly the data and convolving them with the kernel by FFT
+        """
+
+        bandwidth = self.bandwidth
+        minimum, maximum = float(np.min(self._points)), float(np.max(self._points))
+        grid = np.linspace(minimum - self._cut * bandwidth, maximum + self._cut * bandwidth, self._grid_size)
+        step = grid[1] - grid[0]
+
+        binned = np.zeros(self._grid_size)
+        for start in range(0, self._points.size, _CHUNK_SIZE):
+            points = self._points[start:start + _CHUNK_SIZE]
+            weights = 1. if self._weights is None else self._weights[start:start + _CHUNK_SIZE]
+            position = (points - grid[0]) / step
+            index = np.clip(np.floor(position).astype(np.int64), 0, self._grid_size - 2)
+            fraction = position - index
+            binned += np.bincount(index, weights * (1. - fraction), minlength=self._grid_size)
+            binned += np.bincount(index + 1, weights * fraction, minlength=self._grid_size)
+
+        half = min(self._grid_size - 1, int(ceil(_KDE_KERNEL_CUT * bandwidth / step)))
+        kernel = np.exp(-0.5 * (np.arange(-half, half + 1) * step / bandwidth) ** 2)
+        kernel /= np.sum(kernel) * step
+        size = 1 << int(self._grid_size + 2 * half - 1).bit_length()
+        convolution = np.fft.irfft(np.fft.rfft(binned, size) * np.fft.rfft(kernel, size), size)
+        self._density = np.maximum(convolution[half:half + self._grid_size], 0.) / self._size
+        self._grid = grid
+
+    @property
+    def grid(self) -> np.ndarray:
+        """
+        Points of the grid
+        """
+
+        if self._grid is None:
+            self._evaluate()
+        return self._grid
+
+    @property
+    def density(self) -> np.ndarray:
+        """
+        Estimate of the density in the points of the grid
+        """
+
+        if self._density is None:
+            self._evaluate()
+        return self._density
+
+    @property
+    def range(self) -> tuple[float, float]:
+        """
+        Lower and upper limits of the grid, outside which the estimate is 0
+        """
+
+        grid = self.grid
+        return float(grid[0]), float(grid[-1])
+
+    def __call__(self,
+                 x: float | np.ndarray) -> float | np.ndarray:
+        """
+        Calculation of the estimate of the density, interpolated linearly between the points of the grid
+
+        Args:
+            x: point or array of points
+
+        Returns:
+            The estimate of the density in the points
+        """
+
+        return np.interp(x, self.grid, self.density, left=0., right=0.)
+
+    def cdf(self,
+            x: float | np.ndarray) -> float | np.ndarray:
+        """
+        Calculation of the cumulative distribution of the estimate
+
+        Args:
+            x: point or array of points
+
+        Returns:
+            The cumulative distribution in the points
+        """
+
+        table = self.inverse_cdf()
+        return np.interp(x, table.x, table.cdf, left=0., right=1.)
+
+    def inverse_cdf(self) -> InverseCDF:
+        """
+        Tabulated inverse of the cumulative distribution of the estimate on the points of the grid,
+        to generate numbers distributed accordingly to the estimate with the inverse function method
+
+        Returns:
+            The table of the inverse of the cumulative distribution
+        """
+
+        density = self.density
+        cdf = np.concatenate(([0.], np.cumsum(0.5 * (density[1:] + density[:-1]))))
+        return InverseCDF(self.grid, cdf / cdf[-1])
+
+    def sample(self,
+               n: int,
+               seed: float = 0.,
+               stream: Stream = None) -> np.ndarray:
+        """
+        Generation of an array of n pseudo-casual numbers distributed accordingly to the estimate
+
+        Args:
+            n: number of pseudo-casual numbers to generate
+            seed: starting seed for the random generation (optional)
+            stream: independent stream of pseudo-casual numbers, used instead of the seed (optional)
+
+        Returns:
+            An array of n pseudo-casual numbers generated according to the estimate
+        """
+
+        return self.inverse_cdf().sample(n, seed, stream)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _jackknife_values(data: np.ndarray,
+                      estimator,
+                      n_groups: int) -> np.ndarray:
+    """
+    Calculation of the estimator on the sample without each of n_groups consecutive groups of data
+    (delete-d jackknife)
+
+    Args:
+        data: array of floats representing data
+        estimator: estimator in the form estimator(data, axis)
+        n_groups: number of groups
+
+    Returns:
+        The array of the n_groups estimates
+    """
+
+    bounds = np.linspace(0, data.size, n_groups + 1).astype(np.int64)
+    values = np.empty(n_groups)
+    for group in range(n_groups):
+        rest = np.concatenate((data[:bounds[group]], data[bounds[group + 1]:]))
+        values[group] = np.asarray(estimator(rest[np.newaxis, :], axis=1), dtype=float).ravel()[0]
+    return values
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def jackknife(sample: list[float] | np.ndarray | Sample,
+              estimator,
+              n_groups: int = None) -> tuple[float, float, float]:
+    """
+    Calculation of the bias and of the standard error of an estimator with the jackknife method: the estimator
+    is computed again without each of n_groups groups of consecutive data (with n_groups equal to the size of
+    the sample this is the leave-one-out jackknife). The data are assumed to be in a random order
+
+    Args:
+        sample: list, array or Sample of floats representing data
+        estimator: estimator in the form estimator(data, axis), returning the estimates along the axis of an
+            array, like np.mean, np.median or the functions mean, variance, stddev, skewness, kurtosis of stat
+        n_groups: number of groups (optional, default: None, the size of the sample up to 200)
+
+    Returns:
+        The estimate on the whole sample, the jackknife estimate of its bias and of its standard error
+    """
+
+    data = np.asarray(sample, dtype=float).ravel()
+    n_groups = min(data.size, 200) if n_groups is None else n_groups
+    estimate = float(np.asarray(estimator(data[np.newaxis, :], axis=1), dtype=float).ravel()[0])
+    values = _jackknife_values(data, estimator, n_groups)
+    average = float(np.mean(values))
+    bias = (n_groups - 1) * (average - estimate)
+    error = sqrt((n_groups - 1) / n_groups * float(np.sum((values - average) ** 2)))
+    return estimate, bias, error
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+class BootstrapResult:
+    """
+    Result of bootstrap
+
+    Args:
+        estimate: estimate on the whole sample
+        replicates: array of the estimates on the bootstrap replicas
+        bias: bootstrap estimate of the bias (mean of the replicates - estimate)
+        stderr: bootstrap estimate of the standard error (standard deviation of the replicates)
+        percentile_interval: confidence interval given by the quantiles of the replicates
+        bca_interval: bias-corrected and accelerated (BCa) confidence interval
+        jackknife_bias: jackknife estimate of the bias
+    """
+
+    __slots__ = ('estimate', 'replicates', 'bias', 'stderr', 'percentile_interval', 'bca_interval',
+                 'jackknife_bias')
+
+    def __init__(self,
+                 estimate: float,
+                 replicates: np.ndarray,
+                 bias: float,
+                 stderr: float,
+                 percentile_interval: tuple[float, float],
+                 bca_interval: tuple[float, float],
+                 jackknife_bias: float):
+        self.estimate = estimate
+        self.replicates = replicates
+        self.bias = bias
+        self.stderr = stderr
+        self.percentile_interval = percentile_interval
+        self.bca_interval = bca_interval
+        self.jackknife_bias = jackknife_bias
+
+    def __repr__(self) -> str:
+        return (f'BootstrapResult(estimate={self.estimate!r}, bias={self.bias!r}, stderr={self.stderr!r}, '
+                f'percentile_interval={self.percentile_interval!r}, bca_interval={self.bca_interval!r}, '
+                f'jackknife_bias={self.jackknife_bias!r})')
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def _bootstrap_replicates(data: np.ndarray,
+                          estimator,
+                          size: int,
+                          stream: Stream) -> np.ndarray:
+    """
+    Calculation of the estimator on a batch of bootstrap replicas, drawn as a matrix of indices
+
+    Args:
+        data: array of floats representing data
+        estimator: estimator in the form estimator(data, axis)
+        size: number of replicas of the batch
+        stream: independent stream of the batch
+
+    Returns:
+        The array of the estimates on the replicas
+    """
+
+    index = stream.generator.integers(data.size, size=(size, data.size))
+    return np.asarray(estimator(data[index], axis=1), dtype=float).reshape(size)
+
+
+# ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
+
+
+def bootstrap(sample: list[float] | np.ndarray | Sample,
+              estimator,
+              n_rep: int = 1000,
+              confidence: float = 0.6827,
+              n_groups: int = None,
+              workers: int = 1,
+              batch_size: int = None,
+              stream: Stream = None) -> BootstrapResult:
+    """
+    Calculation of the uncertainty of an estimator with the bootstrap method. The replicas are drawn in batches
+    as matrices of indices and the estimator is applied at once to all the replicas of a batch. The batches can be
+    split across a pool of worker processes: the batch with index i uses the substream i of the stream, so the
+    result does not depend on the number of workers. The acceleration of the BCa interval and the jackknife bias
+    are computed with the delete-d jackknife over n_groups groups of data
+
+    Args:
+        sample: list, array or Sample of floats representing data
+        estimator: estimator in the form estimator(data, axis), returning the estimates along the axis of an
+            array, like np.mean, np.median or the functions mean, variance, stddev, skewness, kurtosis of stat
+            [with more than one worker, it must be defined at module level]
+        n_rep: number of bootstrap replicas (optional, default: 1000)
+        confidence: confidence level of the intervals (optional, default: 0.6827, one standard deviation)
+        n_groups: number of groups of the jackknife (optional, default: None, the size of the sample up to 200)
+        workers: number of worker processes, None for the number of processors of the machine
+            (optional, default: 1)
+        batch_size: number of replicas of each batch (optional, default: None, about 2^22 values per batch)
+        stream: independent stream of pseudo-casual numbers (optional, default: None, fresh entropy)
+
+    Returns:
+        The result of the bootstrap, with the replicates, the bias, the standard error, the percentile and BCa
+        confidence intervals and the jackknife bias
+    """
+
+    data = np.asarray(sample, dtype=float).ravel()
+    if stream is None:
+        stream = Stream()
+    if batch_size is None:
+        batch_size = max(1, _CHUNK_SIZE // data.size)
+    replicates = np.concatenate(_map_chunks(_bootstrap_replicates, n_rep, batch_size, stream, workers,
+                                            data, estimator))
+
+    estimate = float(np.asarray(estimator(data[np.newaxis, :], axis=1), dtype=float).ravel()[0])
+    n_groups = min(data.size, 200) if n_groups is None else n_groups
+    values = _jackknife_values(data, estimator, n_groups)
+    alpha = (1. - confidence) / 2.
+    percentile_interval = (float(np.quantile(replicates, alpha)), float(np.quantile(replicates, 1. - alpha)))
+
+    # bias correction and acceleration of the BCa interval
+    from statistics import NormalDist
+    normal = NormalDist()
+    fraction = (np.count_nonzero(replicates < estimate) + 0.5 * np.count_nonzero(replicates == estimate)) / n_rep
+    fraction = min(max(fraction, 0.5 / n_rep), 1. - 0.5 / n_rep)
+    z_0 = normal.inv_cdf(fraction)
+    deviations = np.mean(values) - values
+    squared = float(np.sum(deviations ** 2))
+    acceleration = float(np.sum(deviations ** 3)) / (6. * squared ** 1.5) if squared > 0. else 0.
+    levels = []
+    for level in (alpha, 1. - alpha):
+        z = z_0 + normal.inv_cdf(level)
+        levels.append(normal.cdf(z_0 + z / (1. - acceleration * z)))
+    bca_interval = (float(np.quantile(replicates, levels[0])), float(np.quantile(replicates, levels[1])))
+
+    jackknife_bias = (n_groups - 1) * float(np.mean(values) - estimate)
+    return BootstrapResult(estimate, replicates, float(np.mean(replicates)) - estimate,
+                           float(np.std(replicates, ddof=1)), percentile_interval, bca_interval, jackknife_bias)
 
 
 # ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ---- ----
@@ -0,0 +1,36 @@
+import numpy as np
+from spl.stat import Histogram
+
+
+def test_fill_single_value():
+    histogram = Histogram().fill([0.])
+    assert histogram.entries == 1.
+    assert histogram.counts.sum() == 1.
+    lower, upper = Histogram().fill([3.]).range
+    assert lower <= 3. < upper
+    assert upper - lower > 1e-7
+
+
+def test_fill_not_finite():
+    histogram = Histogram().fill([np.nan, np.inf, -np.inf])
+    assert histogram.range is None
+    assert histogram.underflow == 1. and histogram.overflow == 2.
+    histogram.fill([1., 2.])
+    assert histogram.counts.sum() == 2. and histogram.entries == 5.
+
+
+def test_merge_single_value():
+    data = np.random.default_rng(0).normal(0., 1., 1000)
+    merged = Histogram().fill(data).merge(Histogram().fill([3.]))
+    swapped = Histogram().fill([3.]).merge(Histogram().fill(data))
+    assert merged.entries == 1001.
+    assert np.array_equal(merged.counts, swapped.counts)
+    counts, edges = np.histogram(np.append(data, 3.), merged.edges)
+    assert np.array_equal(counts[:-1], merged.counts[:-1])
+
+
+def test_merge_different_scales():
+    merged = Histogram().fill([1e300]).merge(Histogram().fill([1e-300]))
+    assert merged.counts.sum() == 2.
+    merged = Histogram().fill([np.nan]).merge(Histogram().fill([1., 2.]))
+    assert merged.overflow == 1. and merged.counts.sum() == 2.